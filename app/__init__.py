@@ -3,18 +3,32 @@ from flask_migrate import Migrate
 
 from config import config
 from flask_ddd import DDD
-from .common.adapter.repositories.sql import db
+from .common.adapter import warmup
+from .common.adapter.compression import compress_responses
+from .common.adapter.profiling import profile_memory
+from .common.adapter.repositories.instrumentation import instrument_requests
+from .common.adapter.repositories.sql import db, apply_sqlite_pragmas
 
 
-def create_app(config_name):
+def create_app(config_name, **config_overrides):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.config.update(config_overrides)
+    warmup.init_app(app)
 
     db.init_app(app)
+    apply_sqlite_pragmas(app)
+    instrument_requests(app)
+    profile_memory(app)
+    compress_responses(app)
     DDD(app)
     Migrate(app, db)
 
-    from .blog.presentation import blog
+    from .blog.presentation import blog, api
     app.register_blueprint(blog)
+    app.register_blueprint(api)
+
+    if app.config['WARMUP']:
+        warmup.warmup(app)
 
     return app
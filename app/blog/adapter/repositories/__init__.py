@@ -1,3 +1,4 @@
 from .sql import *
+from .sql import init_app
 
 __all__ = ['TagRepo', 'ArticleRepo']
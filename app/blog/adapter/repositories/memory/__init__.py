@@ -0,0 +1,19 @@
+from sqlalchemy.orm import selectinload
+
+from app.common.adapter.repositories.sql import db
+from ..sql.repos import SqlTagRepo
+from .repos import MemoryTagRepo as TagRepo, MemoryArticleRepo as ArticleRepo
+from .repos import store
+from ....domain.models import Article
+
+__all__ = ['TagRepo', 'ArticleRepo']
+
+
+def init_app(app):
+    store.clear()
+    if app.config.get('MEMORY_REPOSITORY_SNAPSHOT'):
+        with app.app_context():
+            articles = db.session.query(Article).options(
+                selectinload(Article.tags)).all()
+            store.load(SqlTagRepo().all(), articles)
+            db.session.remove()
@@ -0,0 +1,273 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import List, Tuple
+
+from app.blog.domain.events import ArticleSaved, TagSaved
+from app.blog.domain.models import Tag, Article, ArticleCursor, \
+    ArticleSummary, SearchResult
+from app.blog.domain.registries import services
+from app.blog.domain.repos import TagRepo, ArticleRepo
+from ddd import dispatcher
+
+
+class MemoryStore:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.tags = {}
+            self.articles = {}
+            self.order = []
+            self.live = []
+            self.by_tag = defaultdict(list)
+
+    def put_tag(self, tag):
+        """Stores ``tag``, updating the known one in place: stored
+        articles share it, so a rename reaches them as it does in SQL.
+        """
+        stored = self.tags.get(tag.id.value)
+        if stored is None:
+            stored = self.tags[tag.id.value] = _clone(tag)
+        else:
+            for name in tag._attrs:
+                setattr(stored, name, getattr(tag, name))
+        return stored
+
+    def put_article(self, article):
+        id = article.id.value
+        previous = self.articles.get(id)
+        if previous:
+            key = _key(previous)
+            _discard(self.order, key)
+            _discard(self.live, key)
+            for tag in previous.tags:
+                _discard(self.by_tag[tag.id.value], key)
+
+        article = _clone(article)
+        article.tags = [self.put_tag(tag) for tag in article.tags]
+        self.articles[id] = article
+        key = _key(article)
+        insort(self.order, key)
+        if article.deleted_at is None:
+            insort(self.live, key)
+            for tag in article.tags:
+                insort(self.by_tag[tag.id.value], key)
+
+    def load(self, tags, articles):
+        with self.lock:
+            for tag in tags:
+                self.put_tag(tag)
+            for article in articles:
+                self.put_article(article)
+
+
+store = MemoryStore()
+
+
+class MemoryTagRepo(TagRepo):
+    def __init__(self, store=store):
+        self._store = store
+
+    def save(self, tag: Tag):
+        self.save_many([tag])
+
+    def save_many(self, tags: List[Tag]):
+        with self._store.lock:
+            for tag in tags:
+                tag.record(TagSaved(tag.id))
+                self._store.put_tag(tag)
+        for tag in tags:
+            self._notify(tag)
+        _publish(tags)
+
+    def all(self) -> List[Tag]:
+        with self._store.lock:
+            return [_clone(tag) for tag in self._store.tags.values()]
+
+    def all_with_counts(self) -> List[Tuple[Tag, int]]:
+        with self._store.lock:
+            return [(_clone(tag), len(self._store.by_tag.get(id, ())))
+                    for id, tag in self._store.tags.items()]
+
+
+class MemoryArticleRepo(ArticleRepo):
+    def __init__(self, store=store):
+        self._store = store
+
+    def save(self, article: Article):
+        self.save_many([article])
+
+    def save_many(self, articles: List[Article]):
+        for article in articles:
+            article.render(services.content_renderer)
+            article.record(ArticleSaved(article.id, article.last_modified))
+        with self._store.lock:
+            for article in articles:
+                self._store.put_article(article)
+        for article in articles:
+            self._notify(article)
+        _publish(articles)
+
+    def iter_articles(self, batch_size=500):
+        with self._store.lock:
+            ids = sorted(self._store.articles)
+        for start in range(0, len(ids), batch_size):
+            yield self.articles_of(ids[start: start + batch_size])
+
+    def recent_articles_of_page(self, page=0, page_count=10,
+                                include_deleted=False) -> List[Article]:
+        with self._store.lock:
+            keys = self._store.order if include_deleted else self._store.live
+            return self._articles_of(
+                keys[page * page_count: (page + 1) * page_count])
+
+    def listing_page(self, page=0, page_count=10) -> List[ArticleSummary]:
+        with self._store.lock:
+            keys = self._store.live[page * page_count: (page + 1) * page_count]
+            return [_summary(self._store.articles[id]) for _, id in keys]
+
+    def rebuild_listing(self):
+        pass
+
+    def article(self, id, include_deleted=False):
+        with self._store.lock:
+            article = self._store.articles.get(id)
+            if article and (include_deleted or article.deleted_at is None):
+                return _clone(article)
+            return None
+
+    def version_of_article(self, id):
+        with self._store.lock:
+            article = self._store.articles.get(id)
+            if article and article.deleted_at is None:
+                return article.last_modified, article.content_key
+            return None
+
+    def versions_of_page(self, page=0, page_count=10):
+        with self._store.lock:
+            keys = self._store.live[page * page_count: (page + 1) * page_count]
+            return [(id, self._store.articles[id].last_modified)
+                    for _, id in keys]
+
+    def latest_versions(self, limit=10):
+        with self._store.lock:
+            keys = self._store.live[:-limit - 1:-1] if limit else []
+            return [(id, self._store.articles[id].last_modified)
+                    for _, id in keys]
+
+    def articles_of(self, ids) -> List[Article]:
+        with self._store.lock:
+            return [_clone(self._store.articles[id]) for id in ids
+                    if id in self._store.articles]
+
+    def first_live_id(self, start=None):
+        ids = [id for id, _ in self._live_versions()]
+        position = 0 if start is None else bisect_left(ids, start)
+        return ids[position] if position < len(ids) else None
+
+    def version_range(self, first_id, next_id=None):
+        run = [(id, version) for id, version in self._live_versions()
+               if id >= first_id and (next_id is None or id < next_id)]
+        if not run:
+            return None
+        return (run[0][0], run[-1][0], len(run),
+                max(version for _, version in run))
+
+    def iter_versions(self, first_id, last_id, batch_size=1000):
+        versions = [(id, version) for id, version in self._live_versions()
+                    if first_id <= id <= last_id]
+        for start in range(0, len(versions), batch_size):
+            yield versions[start: start + batch_size]
+
+    def _live_versions(self):
+        with self._store.lock:
+            return sorted((id, self._store.articles[id].last_modified)
+                          for _, id in self._store.live)
+
+    def recent_articles(self, cursor: ArticleCursor = None, limit=10,
+                        fields=None) -> List[Article]:
+        with self._store.lock:
+            keys = self._store.live
+            start = bisect_right(keys, tuple(cursor)) if cursor else 0
+            return self._articles_of(keys[start: start + limit])
+
+    def articles_by_tag(self, tag_id, cursor: ArticleCursor = None,
+                        limit=10) -> List[Article]:
+        with self._store.lock:
+            keys = self._store.by_tag.get(tag_id, [])
+            start = bisect_right(keys, tuple(cursor)) if cursor else 0
+            return self._articles_of(keys[start: start + limit])
+
+    def search(self, query, limit=10, cursor=0) -> List[SearchResult]:
+        terms = _words(query)
+        if not terms:
+            return []
+        with self._store.lock:
+            articles = [article for article in self._store.articles.values()
+                        if article.deleted_at is None]
+
+        results = []
+        for article in articles:
+            title, content = _words(article.title), _words(article.content)
+            if all(term in title or term in content for term in terms):
+                rank = -float(sum(10 * title.count(term) + content.count(term)
+                                  for term in terms))
+                results.append(SearchResult(
+                    article.id, article.title,
+                    _snippet(article.content, terms), rank))
+        results.sort(key=lambda result: (result.rank, result.article_id.value))
+        return results[cursor: cursor + limit]
+
+    def rebuild_search_index(self):
+        pass
+
+    def _articles_of(self, keys):
+        return [_clone(self._store.articles[id]) for _, id in keys]
+
+
+def _summary(article):
+    return ArticleSummary(
+        article.id, article.title, article.author.name, article.created_at,
+        [tag.name for tag in sorted(article.tags,
+                                    key=lambda tag: tag.id.value)])
+
+
+def _key(article):
+    return article.created_at, article.id.value
+
+
+def _discard(keys, key):
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
+
+
+def _publish(models):
+    dispatcher.publish(*(event for model in models
+                         for event in model.pull_events()))
+
+
+def _clone(model):
+    values = {a: getattr(model, a) for a in model._attrs}
+    if isinstance(model, Article):
+        values['tags'] = [_clone(tag) for tag in model.tags]
+    return model.__class__(**values)
+
+
+def _words(text):
+    return re.findall(r'\w+', text.lower())
+
+
+def _snippet(content, terms, width=64):
+    pattern = re.compile(
+        r'\b(?:{})\b'.format('|'.join(map(re.escape, terms))), re.IGNORECASE)
+    match = pattern.search(content)
+    start = max(0, match.start() - width // 2) if match else 0
+    snippet = pattern.sub(
+        lambda m: SearchResult.HIGHLIGHT_START + m.group(0) +
+        SearchResult.HIGHLIGHT_END, content[start: start + width])
+    return ('…' if start else '') + snippet
@@ -1,2 +1,16 @@
+from sqlalchemy.engine.url import make_url
+
 from . import tables
 from .repos import SqlTagRepo as TagRepo, SqlArticleRepo as ArticleRepo
+
+__all__ = ['TagRepo', 'ArticleRepo']
+
+
+def init_app(app):
+    # Search and the tag article counts are kept by SQLite FTS5 and
+    # triggers; on another database they would silently go stale.
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend != 'sqlite':
+        raise RuntimeError(
+            f'The blog SQL repositories need SQLite, not {backend}')
@@ -1,27 +1,308 @@
-from typing import List
+import json
+from collections import defaultdict
+from typing import List, Tuple
 
-from app.blog.domain.models import Tag, Article
+from sqlalchemy import and_, func, select, text, tuple_
+from sqlalchemy.orm import contains_eager, defer, selectinload
+
+from app.blog.domain.events import ArticleSaved, TagSaved
+from app.blog.domain.models import Tag, Article, ArticleId, ArticleCursor, \
+    ArticleSummary, SearchResult
+from app.blog.domain.registries import services
 from app.blog.domain.repos import TagRepo, ArticleRepo
-from app.common.adapter.repositories.sql import db
+from app.common.adapter.repositories.sql import db, read_only
+from ddd import dispatcher
+from .tables import tag, article, tag_article_association, article_listing
+
+_search = text(
+    'SELECT article_fts.rowid AS id, article.title AS title, '
+    "snippet(article_fts, 1, char(2), char(3), '…', 16) AS snippet, "
+    'bm25(article_fts, 10.0, 1.0) AS rank '
+    'FROM article_fts JOIN article ON article.id = article_fts.rowid '
+    'WHERE article_fts MATCH :query AND article.deleted_at IS NULL '
+    'ORDER BY rank LIMIT :limit OFFSET :offset')
+
+_listing_batch_size = 500
+
+_deferrable = ('content', 'content_html', 'content_key')
 
 
 class SqlTagRepo(TagRepo):
     def save(self, tag: Tag):
-        db.session.merge(tag)
-        db.session.commit()
+        self.save_many([tag])
 
+    def save_many(self, tags: List[Tag]):
+        for model in tags:
+            model.record(TagSaved(model.id))
+            db.session.merge(model)
+        db.session.flush()
+        association = tag_article_association
+        _refresh_listing([id for id, in db.session.execute(
+            select([association.c.article_id]).where(
+                association.c.tag_id.in_(
+                    [model.id.value for model in tags])).distinct())])
+        _commit(tags)
+        for model in tags:
+            self._notify(model)
+
+    @read_only
     def all(self) -> List[Tag]:
         return db.session.query(Tag).all()
 
+    @read_only
+    def all_with_counts(self) -> List[Tuple[Tag, int]]:
+        return db.session.query(Tag, tag.c.article_count).all()
+
 
 class SqlArticleRepo(ArticleRepo):
     def save(self, article: Article):
-        db.session.merge(article)
-        db.session.commit()
+        self.save_many([article])
+
+    def save_many(self, articles: List[Article]):
+        for model in articles:
+            model.render(services.content_renderer)
+            model.record(ArticleSaved(model.id, model.last_modified))
+            db.session.merge(model)
+        _refresh_listing([model.id.value for model in articles])
+        _commit(articles)
+        for model in articles:
+            self._notify(model)
 
-    def recent_articles_of_page(self, page=0, page_count=10) -> List[Article]:
-        return db.session.query(Article).order_by(Article.created_at)[
+    def wrote(self):
+        return bool(db.session().info.get('wrote'))
+
+    def iter_articles(self, batch_size=500):
+        last_id = None
+        while True:
+            batch = self._articles_after(last_id, batch_size)
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1].id.value
+
+    @read_only
+    def _articles_after(self, last_id, limit):
+        article_id = article.c['__id']
+        query = db.session.query(Article).options(selectinload(Article.tags))
+        if last_id is not None:
+            query = query.filter(article_id > last_id)
+        return query.order_by(article_id).limit(limit).all()
+
+    @read_only
+    def recent_articles_of_page(self, page=0, page_count=10,
+                                include_deleted=False) -> List[Article]:
+        query = db.session.query(Article)
+        if not include_deleted:
+            query = query.filter(article.c.deleted_at.is_(None))
+        return query.order_by(article.c.created_at, article.c['__id'])[
                page * page_count: (page + 1) * page_count]
 
-    def article(self, id):
-        return db.session.query(Article).get(id)
\ No newline at end of file
+    @read_only
+    def recent_articles(self, cursor: ArticleCursor = None, limit=10,
+                        fields=None) -> List[Article]:
+        article_id = article.c['__id']
+        query = db.session.query(Article).filter(
+            article.c.deleted_at.is_(None))
+        if fields is not None:
+            query = query.options(*(defer(name) for name in _deferrable
+                                    if name not in fields))
+            if 'tags' in fields:
+                query = query.options(selectinload(Article.tags))
+        if cursor:
+            query = query.filter(tuple_(article.c.created_at, article_id) >
+                                 tuple_(cursor.created_at, cursor.id))
+        return query.order_by(article.c.created_at, article_id)[:limit]
+
+    @read_only
+    def listing_page(self, page=0, page_count=10) -> List[ArticleSummary]:
+        listing = article_listing
+        rows = db.session.execute(select([
+            listing.c['__id'], listing.c.title, listing.c.author_name,
+            listing.c.created_at, listing.c.tag_names
+        ]).order_by(listing.c.created_at, listing.c['__id']).limit(
+            page_count).offset(page * page_count))
+        return [ArticleSummary(ArticleId(id), title, author_name, created_at,
+                               json.loads(tag_names))
+                for id, title, author_name, created_at, tag_names in rows]
+
+    def rebuild_listing(self):
+        db.session.execute(article_listing.delete())
+        article_id = article.c['__id']
+        last_id = None
+        while True:
+            query = select([article_id]).order_by(article_id).limit(
+                _listing_batch_size)
+            if last_id is not None:
+                query = query.where(article_id > last_id)
+            ids = [id for id, in db.session.execute(query)]
+            _refresh_listing(ids)
+            if len(ids) < _listing_batch_size:
+                break
+            last_id = ids[-1]
+        db.session.commit()
+
+    @read_only
+    def article(self, id, include_deleted=False):
+        association = tag_article_association
+        found = next(iter(db.session.query(Article).outerjoin(
+            association, association.c.article_id == article.c['__id']
+        ).outerjoin(tag, tag.c['__id'] == association.c.tag_id).options(
+            contains_eager(Article.tags)).filter(
+                article.c['__id'] == id).all()), None)
+        if found and (include_deleted or found.deleted_at is None):
+            return found
+        return None
+
+    @read_only
+    def version_of_article(self, id):
+        row = db.session.query(
+            article.c.created_at, article.c.updated_at, article.c.content_key
+        ).filter(article.c['__id'] == id,
+                 article.c.deleted_at.is_(None)).first()
+        return row and (row.updated_at or row.created_at, row.content_key)
+
+    @read_only
+    def versions_of_page(self, page=0, page_count=10):
+        article_id = article.c['__id']
+        rows = db.session.query(
+            article_id, article.c.created_at, article.c.updated_at
+        ).filter(article.c.deleted_at.is_(None)).order_by(
+            article.c.created_at, article_id
+        )[page * page_count: (page + 1) * page_count]
+        return [(id, updated_at or created_at)
+                for id, created_at, updated_at in rows]
+
+    @read_only
+    def latest_versions(self, limit=10):
+        article_id = article.c['__id']
+        rows = db.session.query(
+            article_id, article.c.created_at, article.c.updated_at
+        ).filter(article.c.deleted_at.is_(None)).order_by(
+            article.c.created_at.desc(), article_id.desc())[:limit]
+        return [(id, updated_at or created_at)
+                for id, created_at, updated_at in rows]
+
+    @read_only
+    def articles_of(self, ids) -> List[Article]:
+        if not ids:
+            return []
+        return db.session.query(Article).filter(
+            article.c['__id'].in_(ids)).all()
+
+    @read_only
+    def first_live_id(self, start=None):
+        article_id = article.c['__id']
+        query = select([article_id]).where(
+            article.c.deleted_at.is_(None)).order_by(article_id).limit(1)
+        if start is not None:
+            query = query.where(article_id >= start)
+        return db.session.execute(query).scalar()
+
+    @read_only
+    def version_range(self, first_id, next_id=None):
+        article_id = article.c['__id']
+        conditions = [article_id >= first_id, article.c.deleted_at.is_(None)]
+        if next_id is not None:
+            conditions.append(article_id < next_id)
+        row = db.session.execute(select([
+            func.min(article_id), func.max(article_id), func.count(),
+            func.max(func.coalesce(article.c.updated_at,
+                                   article.c.created_at))
+        ]).where(and_(*conditions))).first()
+        return tuple(row) if row[2] else None
+
+    def iter_versions(self, first_id, last_id, batch_size=1000):
+        while first_id <= last_id:
+            batch = self._versions_from(first_id, last_id, batch_size)
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            first_id = batch[-1][0] + 1
+
+    @read_only
+    def _versions_from(self, first_id, last_id, limit):
+        article_id = article.c['__id']
+        rows = db.session.query(
+            article_id, article.c.created_at, article.c.updated_at
+        ).filter(article_id.between(first_id, last_id),
+                 article.c.deleted_at.is_(None)
+                 ).order_by(article_id).limit(limit)
+        return [(id, updated_at or created_at)
+                for id, created_at, updated_at in rows]
+
+    @read_only
+    def articles_by_tag(self, tag_id, cursor: ArticleCursor = None,
+                        limit=10) -> List[Article]:
+        article_id = article.c['__id']
+        query = db.session.query(Article).join(
+            tag_article_association,
+            tag_article_association.c.article_id == article_id
+        ).filter(tag_article_association.c.tag_id == tag_id,
+                 article.c.deleted_at.is_(None))
+        if cursor:
+            query = query.filter(tuple_(article.c.created_at, article_id) >
+                                 tuple_(cursor.created_at, cursor.id))
+        return query.order_by(article.c.created_at, article_id)[:limit]
+
+    @read_only
+    def search(self, query, limit=10, cursor=0) -> List[SearchResult]:
+        match = _fts_query(query)
+        if not match:
+            return []
+        rows = db.session.execute(
+            _search, {'query': match, 'limit': limit, 'offset': cursor})
+        return [SearchResult(ArticleId(row.id), row.title, row.snippet,
+                             row.rank) for row in rows]
+
+    def rebuild_search_index(self):
+        db.session.execute(
+            "INSERT INTO article_fts(article_fts) VALUES ('rebuild')")
+        db.session.commit()
+
+
+def _commit(models):
+    """Commits the session, then publishes the events ``models`` recorded;
+    a failed commit drops them with the transaction.
+    """
+    events = [event for model in models for event in model.pull_events()]
+    db.session.commit()
+    dispatcher.publish(*events)
+
+
+def _refresh_listing(article_ids):
+    """Rewrites the article_listing rows of ``article_ids`` from the
+    normalized tables inside the current transaction.
+    """
+    db.session.flush()
+    for start in range(0, len(article_ids), _listing_batch_size):
+        ids = article_ids[start: start + _listing_batch_size]
+        article_id = article.c['__id']
+        association = tag_article_association
+        db.session.execute(article_listing.delete().where(
+            article_listing.c['__id'].in_(ids)))
+        rows = db.session.execute(select([
+            article_id, article.c.title, article.c['__author_name'],
+            article.c.created_at
+        ]).where(and_(article_id.in_(ids), article.c.deleted_at.is_(None))))
+        rows = rows.fetchall()
+        if not rows:
+            continue
+        tag_names = defaultdict(list)
+        for id, name in db.session.execute(select([
+            association.c.article_id, tag.c.name
+        ]).select_from(association.join(
+            tag, association.c.tag_id == tag.c['__id'])).where(
+                association.c.article_id.in_(ids)).order_by(
+                    association.c.article_id, tag.c['__id'])):
+            tag_names[id].append(name)
+        db.session.execute(article_listing.insert(), [{
+            '__id': id, 'title': title, 'author_name': author_name,
+            'created_at': created_at, 'tag_names': json.dumps(tag_names[id])
+        } for id, title, author_name, created_at in rows])
+
+
+def _fts_query(query):
+    terms = query.split()
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
@@ -4,20 +4,23 @@ from ....domain.models import Author, Tag, TagId, Article, ArticleId
 tag = db.Table(
     'tag',
     db.Column('id', db.BigInteger, primary_key=True, unique=True, key='__id'),
-    db.Column('name', db.String(50), unique=True)
+    db.Column('name', db.String(50), unique=True),
+    db.Column('article_count', db.Integer, nullable=False, server_default='0')
 )
 
 TagId.__composite_values__ = lambda self: (self.value,)
 
 db.mapper(Tag, tag, properties={
     'id': db.composite(TagId, tag.c.__id),
-})
+}, exclude_properties=['article_count'])
 
 article = db.Table(
     'article',
     db.Column('id', db.BigInteger, primary_key=True, unique=True, key='__id'),
     db.Column('title', db.String(100)),
     db.Column('content', db.Text),
+    db.Column('content_html', db.Text),
+    db.Column('content_key', db.String(40)),
     db.Column('author_id', db.BigInteger, key='__author_id'),
     db.Column('author_name', db.String(50), key='__author_name'),
     db.Column('created_at', db.DateTime(timezone=True)),
@@ -25,13 +28,34 @@ article = db.Table(
     db.Column('deleted_at', db.DateTime(timezone=True)),
 )
 
+db.Index('ix_article_live_created_at', article.c.created_at, article.c['__id'],
+         sqlite_where=article.c.deleted_at.is_(None),
+         postgresql_where=article.c.deleted_at.is_(None))
+db.Index('ix_article_created_at', article.c.created_at, article.c['__id'])
+
+article_listing = db.Table(
+    'article_listing',
+    db.Column('id', db.BigInteger, primary_key=True, key='__id'),
+    db.Column('title', db.String(100)),
+    db.Column('author_name', db.String(50)),
+    db.Column('created_at', db.DateTime(timezone=True)),
+    db.Column('tag_names', db.Text, nullable=False, server_default='[]'),
+)
+
+db.Index('ix_article_listing_created_at', article_listing.c.created_at,
+         article_listing.c['__id'])
+
 ArticleId.__composite_values__ = lambda self: (self.value,)
 Author.__composite_values__ = lambda self: (self.id, self.name)
 
 tag_article_association = db.Table(
     'tag_article_association',
-    db.Column('tag_id', db.BigInteger, db.ForeignKey('tag.__id')),
-    db.Column('article_id', db.BigInteger, db.ForeignKey('article.__id'))
+    db.Column('tag_id', db.BigInteger, db.ForeignKey('tag.__id'),
+              primary_key=True),
+    db.Column('article_id', db.BigInteger, db.ForeignKey('article.__id'),
+              primary_key=True),
+    db.Index('ix_tag_article_association_article_id_tag_id',
+             'article_id', 'tag_id')
 )
 
 db.mapper(Article, article, properties={
@@ -40,3 +64,51 @@ db.mapper(Article, article, properties={
         Author, article.c.__author_id, article.c.__author_name),
     'tags': db.relationship(Tag, secondary=tag_article_association)
 })
+
+article_fts_ddl = (
+    "CREATE VIRTUAL TABLE article_fts USING fts5("
+    "title, content, content='article', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER article_fts_insert AFTER INSERT ON article BEGIN "
+    "INSERT INTO article_fts(rowid, title, content) "
+    "VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER article_fts_delete AFTER DELETE ON article BEGIN "
+    "INSERT INTO article_fts(article_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER article_fts_update AFTER UPDATE OF title, content "
+    "ON article BEGIN "
+    "INSERT INTO article_fts(article_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO article_fts(rowid, title, content) "
+    "VALUES (new.id, new.title, new.content); END",
+)
+
+for statement in article_fts_ddl:
+    db.event.listen(article, 'after_create',
+                    db.DDL(statement).execute_if(dialect='sqlite'))
+db.event.listen(article, 'before_drop', db.DDL(
+    'DROP TABLE IF EXISTS article_fts').execute_if(dialect='sqlite'))
+
+tag_article_count_ddl = (
+    "CREATE TRIGGER tag_article_count_insert "
+    "AFTER INSERT ON tag_article_association "
+    "WHEN (SELECT deleted_at FROM article WHERE id = new.article_id) IS NULL "
+    "BEGIN UPDATE tag SET article_count = article_count + 1 "
+    "WHERE id = new.tag_id; END",
+    "CREATE TRIGGER tag_article_count_delete "
+    "AFTER DELETE ON tag_article_association "
+    "WHEN (SELECT deleted_at FROM article WHERE id = old.article_id) IS NULL "
+    "BEGIN UPDATE tag SET article_count = article_count - 1 "
+    "WHERE id = old.tag_id; END",
+    "CREATE TRIGGER tag_article_count_soft_delete "
+    "AFTER UPDATE OF deleted_at ON article "
+    "WHEN (old.deleted_at IS NULL) != (new.deleted_at IS NULL) BEGIN "
+    "UPDATE tag SET article_count = article_count + "
+    "(CASE WHEN new.deleted_at IS NULL THEN 1 ELSE -1 END) "
+    "WHERE id IN (SELECT tag_id FROM tag_article_association "
+    "WHERE article_id = new.id); END",
+)
+
+for statement in tag_article_count_ddl:
+    db.event.listen(tag_article_association, 'after_create',
+                    db.DDL(statement).execute_if(dialect='sqlite'))
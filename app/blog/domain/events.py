@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from ddd import Attr, DomainEvent
+from .models import ArticleId, TagId
+
+
+class ArticleSaved(DomainEvent):
+    article_id: ArticleId = Attr()
+    version: datetime = Attr()
+
+
+class TagSaved(DomainEvent):
+    tag_id: TagId = Attr()
@@ -32,3 +32,41 @@ class Article(Entity):
     updated_at: datetime = Attr(allow_none=True)
     deleted_at: datetime = Attr(allow_none=True)
     tags: List = Attr(default=list)
+    content_html: str = Attr(allow_none=True, default=None)
+    content_key: str = Attr(allow_none=True, default=None)
+
+    @property
+    def last_modified(self):
+        return self.updated_at or self.created_at
+
+    def render(self, renderer):
+        key = renderer.key(self.content)
+        if key != self.content_key:
+            self.content_html = renderer(self.content)
+            self.content_key = key
+
+
+class ArticleSummary(ValueObject):
+    id: ArticleId = Attr()
+    title: str = Attr()
+    author_name: str = Attr()
+    created_at: datetime = Attr()
+    tag_names: List = Attr(default=list)
+
+
+class ArticleCursor(ValueObject):
+    created_at: datetime = Attr()
+    id: int = Attr()
+
+    @classmethod
+    def of(cls, article):
+        return cls(article.created_at, article.id.value)
+
+
+class SearchResult(ValueObject):
+    HIGHLIGHT_START, HIGHLIGHT_END = '\x02', '\x03'
+
+    article_id: ArticleId = Attr()
+    title: str = Attr()
+    snippet: str = Attr()
+    rank: float = Attr()
@@ -1,3 +1,4 @@
 from ddd import Registry
 
 repos = Registry()
+services = Registry()
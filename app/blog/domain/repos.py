@@ -1,8 +1,10 @@
 from abc import abstractmethod
-from typing import List
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
 
 from ddd import Repo
-from .models import Tag, Article
+from .models import Tag, Article, ArticleCursor, ArticleSummary, \
+    SearchResult
 
 
 class TagRepo(Repo):
@@ -12,10 +14,19 @@ class TagRepo(Repo):
     def save(self, tag: Tag):
         pass
 
+    @abstractmethod
+    def save_many(self, tags: List[Tag]):
+        """Saves ``tags`` in a single transaction."""
+        pass
+
     @abstractmethod
     def all(self) -> List[Tag]:
         pass
 
+    @abstractmethod
+    def all_with_counts(self) -> List[Tuple[Tag, int]]:
+        pass
+
 
 class ArticleRepo(Repo):
     __registry_name__ = 'article'
@@ -25,9 +36,104 @@ class ArticleRepo(Repo):
         pass
 
     @abstractmethod
-    def recent_articles_of_page(self, page=0, page_count=10) -> List[Article]:
+    def save_many(self, articles: List[Article]):
+        """Saves ``articles`` in a single transaction."""
+        pass
+
+    def wrote(self) -> bool:
+        """Whether the current unit of work has written, so its reads
+        may differ from what other callers read.
+        """
+        return False
+
+    def delete(self, article: Article):
+        # Naive UTC, like the created_at/updated_at the adapters store.
+        article.deleted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.save(article)
+
+    @abstractmethod
+    def recent_articles_of_page(self, page=0, page_count=10,
+                                include_deleted=False) -> List[Article]:
+        pass
+
+    @abstractmethod
+    def iter_articles(self, batch_size=500) -> Iterator[List[Article]]:
+        """Batches of every article, deleted ones included, with tags,
+        in id order.
+        """
+        pass
+
+    @abstractmethod
+    def recent_articles(self, cursor: ArticleCursor = None, limit=10,
+                        fields=None) -> List[Article]:
+        """Live articles after ``cursor``. Backends may leave attributes
+        outside ``fields`` unloaded.
+        """
+        pass
+
+    @abstractmethod
+    def listing_page(self, page=0,
+                     page_count=10) -> List[ArticleSummary]:
+        pass
+
+    @abstractmethod
+    def rebuild_listing(self):
+        pass
+
+    @abstractmethod
+    def article(self, id, include_deleted=False):
+        pass
+
+    @abstractmethod
+    def version_of_article(self, id) -> Tuple[datetime, str]:
+        """``(last_modified, content_key)`` of a live article; a re-render
+        changes only the key.
+        """
+        pass
+
+    @abstractmethod
+    def versions_of_page(self, page=0,
+                         page_count=10) -> List[Tuple[int, datetime]]:
+        pass
+
+    @abstractmethod
+    def latest_versions(self, limit=10) -> List[Tuple[int, datetime]]:
+        """(id, version) of the newest live articles, newest first."""
+        pass
+
+    @abstractmethod
+    def articles_of(self, ids) -> List[Article]:
+        pass
+
+    @abstractmethod
+    def first_live_id(self, start=None) -> Optional[int]:
+        """The lowest live article id not below ``start``, or None."""
+        pass
+
+    @abstractmethod
+    def version_range(self, first_id, next_id=None) \
+            -> Optional[Tuple[int, int, int, datetime]]:
+        """``(first_id, last_id, count, last_modified)`` of the live
+        articles from ``first_id`` up to, not including, ``next_id``, or
+        None when there are none.
+        """
+        pass
+
+    @abstractmethod
+    def iter_versions(self, first_id, last_id, batch_size=1000) \
+            -> Iterator[List[Tuple[int, datetime]]]:
+        """Batches of live ``(id, version)`` within the id range."""
+        pass
+
+    @abstractmethod
+    def articles_by_tag(self, tag_id, cursor: ArticleCursor = None,
+                        limit=10) -> List[Article]:
+        pass
+
+    @abstractmethod
+    def search(self, query, limit=10, cursor=0) -> List[SearchResult]:
         pass
 
     @abstractmethod
-    def article(self, id):
+    def rebuild_search_index(self):
         pass
@@ -1 +1,3 @@
 from .views import blog
+from .api import api
+from . import commands
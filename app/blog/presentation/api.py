@@ -0,0 +1,110 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, abort, jsonify, request, \
+    stream_with_context
+from werkzeug.exceptions import HTTPException
+
+from .conditional import conditional
+from ..domain.models import ArticleCursor
+from ..usecase import recent_articles, article_by_id, article_version
+
+LIST_MAX_AGE = 60
+MAX_LIMIT = 100
+
+_fields = {
+    'id': lambda article: article.id.value,
+    'title': lambda article: article.title,
+    'author': lambda article: article.author.name,
+    'created_at': lambda article: article.created_at.isoformat(),
+    'updated_at': lambda article: article.updated_at and
+    article.updated_at.isoformat(),
+    'tags': lambda article: [tag.name for tag in article.tags],
+    'content': lambda article: article.content,
+    'content_html': lambda article: article.content_html,
+}
+LIST_FIELDS = ('id', 'title', 'author', 'created_at', 'updated_at')
+DETAIL_FIELDS = LIST_FIELDS + ('tags', 'content_html')
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+
+@api.errorhandler(HTTPException)
+def error(e):
+    return jsonify(error=e.description), e.code
+
+
+def _article_version(id):
+    version = article_version(id)
+    return version and (
+        ('api', id, version, _requested_fields(DETAIL_FIELDS)), version[0])
+
+
+@api.route('/articles')
+def articles():
+    limit = min(request.args.get('limit', 20, type=int), MAX_LIMIT)
+    if limit < 1:
+        abort(400, 'limit must be positive')
+    fields = _requested_fields(LIST_FIELDS)
+    cursor = _decode_cursor(request.args.get('cursor'))
+    articles, next_cursor = recent_articles(cursor, limit, fields)
+    response = Response(stream_with_context(_stream(
+        articles, fields, next_cursor and _encode_cursor(next_cursor))),
+        mimetype='application/json')
+    response.cache_control.public = True
+    response.cache_control.max_age = LIST_MAX_AGE
+    return response
+
+
+@api.route('/articles/<int:id>')
+@conditional(_article_version)
+def article(id):
+    article = article_by_id(id)
+    if article is None:
+        abort(404, 'article not found')
+    return jsonify(_serialize(article, _requested_fields(DETAIL_FIELDS)))
+
+
+def _stream(articles, fields, next_cursor):
+    yield '{"articles": ['
+    for i, article in enumerate(articles):
+        yield (', ' if i else '') + json.dumps(_serialize(article, fields))
+    yield f'], "next": {json.dumps(next_cursor)}}}'
+
+
+def _serialize(article, fields):
+    return {name: _fields[name](article) for name in fields}
+
+
+def _requested_fields(default):
+    requested = request.args.get('fields')
+    if not requested:
+        return default
+    fields = tuple(dict.fromkeys(requested.split(',')))
+    unknown = set(fields) - set(_fields)
+    if unknown:
+        abort(400, f'unknown fields: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def _encode_cursor(cursor):
+    raw = json.dumps([cursor.created_at.isoformat(), cursor.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, id = json.loads(raw)
+        created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo:
+            # Stored times are naive UTC.
+            created_at = created_at.astimezone(timezone.utc).replace(
+                tzinfo=None)
+        return ArticleCursor(created_at, id)
+    except (binascii.Error, ValueError, TypeError):
+        abort(400, 'invalid cursor')
@@ -0,0 +1,183 @@
+import threading
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+from app.common.adapter.caches import LRUCache, DiskCache
+from app.common.adapter.compression import negotiate, compress, \
+    encode_response
+from ..domain.repos import ArticleRepo, TagRepo
+
+
+class CachedPage:
+    def __init__(self, status, headers, body, depends_on, window=None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.depends_on = depends_on
+        self.window = window
+        self.variants = {}
+
+    def affected_by(self, dependency, listing_key=None):
+        if dependency in self.depends_on:
+            return True
+        if listing_key is None or self.window is None:
+            return False
+        last_key, full = self.window
+        return not full or listing_key <= last_key
+
+    def to_response(self):
+        response = current_app.response_class(
+            self.body, status=self.status, headers=self.headers)
+        encoding = negotiate(response.mimetype, len(self.body))
+        if encoding:
+            if encoding not in self.variants:
+                self.variants[encoding] = compress(self.body, encoding)
+            encode_response(response, encoding, self.variants[encoding])
+        return response
+
+
+class PageCache:
+    """Caches rendered blog pages, evicting them when the articles or
+    tags they were rendered from are saved. Pages are keyed by the
+    ``g.page_version`` that :func:`conditional` sets too, so a save made
+    by another process, which evicts nothing here, is never served
+    under its new ETag.
+    """
+
+    def __init__(self, maxsize=512, directory=None):
+        self._lock = threading.Lock()
+        self._filling = {}
+        self._generation = 0
+        self.configure(maxsize, directory)
+
+    def configure(self, maxsize, directory=None):
+        self._memory = LRUCache(maxsize)
+        self._disk = directory and DiskCache(directory)
+        self._disk_index = {
+            key: _metadata(page) for key, page in self._disk.items()} \
+            if self._disk else {}
+
+    def init_app(self, app):
+        self.configure(app.config['PAGE_CACHE_SIZE'],
+                       app.config['PAGE_CACHE_DIR'])
+
+    def get(self, key):
+        page = self._memory.get(key)
+        if page is None and key in self._disk_index:
+            page = self._disk.get(key)
+            if page is not None:
+                self._memory.set(key, page)
+        return page
+
+    def set(self, key, page):
+        self._memory.set(key, page)
+        if self._disk:
+            self._disk.set(key, page)
+            self._disk_index[key] = _metadata(page)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+        self._memory.clear()
+        if self._disk:
+            self._disk.clear()
+            self._disk_index.clear()
+
+    def invalidate(self, dependency, listing_key=None):
+        with self._lock:
+            self._generation += 1
+        for key, page in self._memory.items():
+            if page.affected_by(dependency, listing_key):
+                self._memory.pop(key)
+        for key, page in list(self._disk_index.items()):
+            if page.affected_by(dependency, listing_key):
+                self._disk.pop(key)
+                del self._disk_index[key]
+
+    def article_saved(self, article):
+        self.invalidate(('article', article.id.value),
+                        (article.created_at, article.id.value))
+
+    def tag_saved(self, tag):
+        self.invalidate(('tag', tag.id.value))
+
+    def depends_on(self, *dependencies):
+        if 'page_dependencies' in g:
+            g.page_dependencies.update(dependencies)
+
+    def listing(self, articles, page_count):
+        """Records a page of the created_at ordered listing, which any
+        article saved at or before its last row can shift.
+        """
+        if 'page_dependencies' not in g:
+            return
+        self.depends_on(*(('article', a.id.value) for a in articles))
+        last_key = articles and (articles[-1].created_at,
+                                 articles[-1].id.value)
+        g.page_window = (last_key, len(articles) == page_count)
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            if not self._memory.maxsize or request.method != 'GET':
+                return view(**kwargs)
+            key = (request.endpoint, g.get('page_version'),
+                   tuple(sorted(kwargs.items())),
+                   tuple(sorted(request.args.items(multi=True))))
+            page = self.get(key)
+            if page is None:
+                page = self._fill(key, view, kwargs)
+            if not isinstance(page, CachedPage):
+                return page
+            encodings = len(page.variants)
+            response = page.to_response()
+            if len(page.variants) != encodings and self._disk and \
+                    self._memory.get(key) is page:
+                self._disk.set(key, page)
+            return response
+
+        return wrapper
+
+    def _fill(self, key, view, kwargs):
+        with self._lock:
+            filling = self._filling.get(key)
+            if filling is None:
+                self._filling[key] = threading.Event()
+            generation = self._generation
+        if filling is not None:
+            filling.wait(timeout=10)
+            page = self.get(key)
+            if page is not None:
+                return page
+            return self._render(key, view, kwargs, None)
+        try:
+            return self._render(key, view, kwargs, generation)
+        finally:
+            with self._lock:
+                self._filling.pop(key).set()
+
+    def _render(self, key, view, kwargs, generation):
+        g.page_dependencies, g.page_window = set(), None
+        response = make_response(view(**kwargs))
+        if response.status_code != 200 or response.is_streamed:
+            return response
+        page = CachedPage(
+            response.status_code,
+            [(k, v) for k, v in response.headers if k != 'Set-Cookie'],
+            response.get_data(), frozenset(g.page_dependencies),
+            g.page_window)
+        with self._lock:
+            fresh = generation == self._generation
+        if fresh:
+            self.set(key, page)
+        return page
+
+
+def _metadata(page):
+    return CachedPage(page.status, (), b'', page.depends_on, page.window)
+
+
+page_cache = PageCache()
+ArticleRepo.listen(page_cache.article_saved)
+TagRepo.listen(page_cache.tag_saved)
@@ -0,0 +1,57 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+
+from .export import export_site
+from .jsonl import export_jsonl, import_jsonl
+from .views import blog
+from ..usecase import rebuild_search_index, rerender_articles, \
+    rebuild_listing
+
+
+@blog.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    rebuild_search_index()
+    click.echo('Search index rebuilt.')
+
+
+@blog.cli.command('rebuild-listing')
+def rebuild_listing_command():
+    rebuild_listing()
+    click.echo('Article listing rebuilt.')
+
+
+@blog.cli.command('export')
+@click.argument('directory', type=click.Path(file_okay=False))
+@click.option('--workers', default=4, show_default=True)
+def export_command(directory, workers):
+    rendered, removed = export_site(directory, workers)
+    click.echo(f'{len(rendered)} pages rendered, {len(removed)} removed.')
+
+
+@blog.cli.command('render-content')
+@click.option('--workers', default=None, type=int,
+              help='Renderer processes, defaults to the CPU count.')
+def render_content_command(workers):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rendered = rerender_articles(
+            lambda render, sources: pool.map(render, sources, chunksize=8))
+    click.echo(f'{rendered} articles rendered.')
+
+
+@blog.cli.command('export-jsonl')
+@click.argument('output', type=click.File('w', encoding='utf-8'))
+@click.option('--batch-size', default=500, show_default=True)
+def export_jsonl_command(output, batch_size):
+    lines = export_jsonl(output, batch_size)
+    click.echo(f'{lines} records exported.', err=True)
+
+
+@blog.cli.command('import-jsonl')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=500, show_default=True)
+@click.option('--checkpoint', type=click.Path(dir_okay=False),
+              help='Progress file, defaults to PATH.checkpoint.')
+def import_jsonl_command(path, batch_size, checkpoint):
+    imported = import_jsonl(path, batch_size, checkpoint)
+    click.echo(f'{imported} records imported.')
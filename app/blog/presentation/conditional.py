@@ -0,0 +1,56 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+
+def conditional(version_of):
+    """Answers conditional GETs with 304 from ``version_of(**view_args)``
+    before the view runs. ``version_of`` returns ``(seed, last_modified)``,
+    the ETag is a digest of the seed, or ``None`` to skip the check. A
+    ``None`` last_modified sends the ETag alone. The ETag is left on
+    ``g.page_version`` for the view.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            version = version_of(**kwargs)
+            if version is None:
+                return view(**kwargs)
+
+            seed, last_modified = version
+            etag = g.page_version = hashlib.sha1(
+                repr(seed).encode()).hexdigest()
+            last_modified = last_modified and _as_utc(last_modified)
+            if _not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(**kwargs))
+            response.set_etag(etag)
+            if last_modified:
+                # Werkzeug writes the current time for None.
+                response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.no_cache = True
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= \
+            _as_utc(request.if_modified_since)
+    return False
+
+
+def _as_utc(moment):
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
@@ -0,0 +1,85 @@
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, url_for
+
+from app.common.adapter.caches import write_atomic
+from .views import PAGE_COUNT
+from ..usecase import page_versions
+
+MANIFEST = 'manifest.json'
+
+
+def export_site(directory, workers=4):
+    """Renders every listing and article page into ``directory``.
+
+    A manifest keeps the version seed and content hash of each exported
+    url, so later runs only re-render pages whose seed changed and drop
+    the files of pages that are gone. Returns the urls rendered and
+    removed.
+    """
+    app = current_app._get_current_object()
+    manifest = _load_manifest(directory)
+    with app.test_request_context():
+        seeds = _seeds()
+    stale = [url for url, seed in seeds.items()
+             if manifest.get(url, {}).get('seed') != seed]
+    previous = [manifest.get(url, {}).get('sha1') for url in stale]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = pool.map(lambda url, digest: _export(
+            app, directory, url, digest), stale, previous)
+        for url, digest in zip(stale, list(digests)):
+            manifest[url] = {'seed': seeds[url], 'sha1': digest}
+
+    removed = [url for url in manifest if url not in seeds]
+    for url in removed:
+        del manifest[url]
+        try:
+            os.remove(_path(directory, url))
+        except FileNotFoundError:
+            pass
+    write_atomic(os.path.join(directory, MANIFEST),
+                 json.dumps(manifest, sort_keys=True).encode())
+    return stale, removed
+
+
+def _seeds():
+    seeds = {}
+    for page in itertools.count():
+        versions = [[id, version.isoformat()]
+                    for id, version in page_versions(page, PAGE_COUNT)]
+        if versions or page == 0:
+            seeds[url_for('blog.index', page=page)] = versions
+        for id, version in versions:
+            seeds[url_for('blog.article', id=id)] = version
+        if len(versions) < PAGE_COUNT:
+            return seeds
+
+
+def _export(app, directory, url, previous_digest):
+    response = app.test_client().get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} responded {response.status}')
+    body = response.get_data()
+    digest = hashlib.sha1(body).hexdigest()
+    path = _path(directory, url)
+    if digest != previous_digest or not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, body)
+    return digest
+
+
+def _path(directory, url):
+    return os.path.join(directory, url.strip('/'), 'index.html')
+
+
+def _load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        os.makedirs(directory, exist_ok=True)
+        return {}
@@ -0,0 +1,113 @@
+import json
+import os
+from datetime import datetime
+
+from app.common.adapter.caches import write_atomic
+from ..domain.models import Article, ArticleId, Author, Tag, TagId
+from ..usecase import all_tags, iter_articles, save_articles, save_tags
+
+
+def export_jsonl(file, batch_size=500):
+    """Writes one JSON object per line, every tag first, then every
+    article with its tags inlined. Returns the number of lines.
+    """
+    lines = 0
+    for tag in all_tags():
+        file.write(json.dumps(_dump_tag(tag)) + '\n')
+        lines += 1
+    for batch in iter_articles(batch_size):
+        file.write(''.join(json.dumps(_dump_article(article)) + '\n'
+                           for article in batch))
+        lines += len(batch)
+    return lines
+
+
+def import_jsonl(path, batch_size=500, checkpoint=None):
+    """Loads a dump written by :func:`export_jsonl`, committing every
+    ``batch_size`` lines. After each commit the byte offset reached is
+    saved to ``checkpoint``, and a later run resumes from it. Returns
+    the number of lines imported by this run.
+    """
+    checkpoint = checkpoint or f'{path}.checkpoint'
+    offset = _load_checkpoint(checkpoint)
+    imported = 0
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        tags, articles = [], []
+        for line in iter(file.readline, b''):
+            if line.strip():
+                record = json.loads(line)
+                if record['type'] == 'tag':
+                    tags.append(_load_tag(record))
+                else:
+                    articles.append(_load_article(record))
+            if len(tags) + len(articles) >= batch_size:
+                imported += _flush(tags, articles)
+                _save_checkpoint(checkpoint, file.tell())
+        imported += _flush(tags, articles)
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return imported
+
+
+def _flush(tags, articles):
+    if tags:
+        save_tags(tags)
+    if articles:
+        save_articles(articles)
+    flushed = len(tags) + len(articles)
+    tags.clear()
+    articles.clear()
+    return flushed
+
+
+def _load_checkpoint(checkpoint):
+    try:
+        with open(checkpoint) as file:
+            return json.load(file)['offset']
+    except FileNotFoundError:
+        return 0
+
+
+def _save_checkpoint(checkpoint, offset):
+    write_atomic(checkpoint, json.dumps({'offset': offset}).encode())
+
+
+def _dump_tag(tag):
+    return {'type': 'tag', 'id': tag.id.value, 'name': tag.name}
+
+
+def _load_tag(record):
+    return Tag(TagId(record['id']), record['name'])
+
+
+def _dump_article(article):
+    return {
+        'type': 'article',
+        'id': article.id.value,
+        'title': article.title,
+        'content': article.content,
+        'author': {'id': article.author.id, 'name': article.author.name},
+        'created_at': _dump_datetime(article.created_at),
+        'updated_at': _dump_datetime(article.updated_at),
+        'deleted_at': _dump_datetime(article.deleted_at),
+        'tags': [_dump_tag(tag) for tag in article.tags],
+    }
+
+
+def _load_article(record):
+    return Article(
+        ArticleId(record['id']), record['title'], record['content'],
+        Author(record['author']['id'], record['author']['name']),
+        _load_datetime(record['created_at']),
+        _load_datetime(record['updated_at']),
+        _load_datetime(record['deleted_at']),
+        tags=[_load_tag(tag) for tag in record['tags']])
+
+
+def _dump_datetime(moment):
+    return moment and moment.isoformat()
+
+
+def _load_datetime(value):
+    return value and datetime.fromisoformat(value)
@@ -1,18 +1,197 @@
-from flask import Blueprint
+from datetime import datetime, timezone
+
+from flask import Blueprint, abort, current_app, g, make_response, \
+    request, stream_with_context, url_for
 from flask import render_template
+from markupsafe import escape, Markup
+
+from app.common.adapter.caches import LRUCache
+from app.common.adapter.warmup import warmer
+from ..cache import page_cache
+from ..conditional import conditional, _as_utc
+from ddd import dispatcher
+from ...domain.events import ArticleSaved
+from ...domain.models import SearchResult
+from ...usecase import articles_by_page, article_by_id, search_articles, \
+    article_version, page_versions, latest_versions, articles_of, \
+    first_live_id, version_range, iter_versions
+
+PAGE_COUNT = 10
 
-from ...usecase import articles_by_page, article_by_id
+feed_entries = LRUCache(maxsize=1024)
+sitemap_shards = LRUCache(maxsize=8)
 
 blog = Blueprint('blog', __name__, template_folder='./templates')
+blog.record_once(lambda state: page_cache.init_app(state.app))
+
+
+def _index_version(page):
+    # ETag only: a delete can change the page without raising the newest
+    # version on it, so If-Modified-Since would answer with a stale 304.
+    return ('index', page, page_versions(page, PAGE_COUNT)), None
 
 
-@blog.route('/')
-def index():
-    articles = articles_by_page()
-    return render_template('index.html', articles=articles)
+def _article_version(id):
+    version = article_version(id)
+    return version and (('article', id, version), version[0])
+
+
+@blog.route('/', defaults={'page': 0})
+@blog.route('/page/<int:page>/')
+@conditional(_index_version)
+@page_cache.cached
+def index(page):
+    articles = articles_by_page(page, PAGE_COUNT)
+    page_cache.listing(articles, PAGE_COUNT)
+    return render_template('index.html', articles=articles, page=page,
+                           has_next=len(articles) == PAGE_COUNT)
 
 
 @blog.route('/article/<int:id>/')
+@conditional(_article_version)
+@page_cache.cached
 def article(id):
     article = article_by_id(id)
+    if article is None:
+        abort(404)
+    page_cache.depends_on(('article', id))
     return render_template('article.html', article=article)
+
+
+def _feed_version():
+    # ETag only, as for the index: a delete can lower the newest version.
+    g.feed_versions = latest_versions(current_app.config['FEED_ENTRY_LIMIT'])
+    return ('feed', g.feed_versions), None
+
+
+@blog.route('/feed.xml')
+@conditional(_feed_version)
+def feed():
+    host = request.host_url
+    entries = {id: feed_entries.get((host, id, version))
+               for id, version in g.feed_versions}
+    for article in articles_of(
+            [id for id, entry in entries.items() if entry is None]):
+        entry = render_template('feed_entry.xml', article=article)
+        feed_entries.set((host, article.id.value, article.last_modified),
+                         entry)
+        entries[article.id.value] = entry
+    updated = max((version for _, version in g.feed_versions),
+                  default=None)
+    response = make_response(render_template(
+        'feed.xml', entries=[Markup(entry) for entry in entries.values()
+                             if entry is not None],
+        updated=updated or datetime.now(timezone.utc).replace(tzinfo=None)))
+    response.mimetype = 'application/atom+xml'
+    return response
+
+
+@dispatcher.subscribe(ArticleSaved)
+def _evict_feed_entry(event):
+    for key, _ in feed_entries.items():
+        if key[1] == event.article_id.value:
+            feed_entries.pop(key)
+
+
+def _live_shards(size):
+    """Numbers of the sitemap shards holding a live article. Shard ``n``
+    lists the ids from ``n * size`` up to ``(n + 1) * size``, so its
+    bounds never move, late or out-of-order ids included, and it never
+    lists more than ``size`` articles. Costs one index seek per shard.
+    """
+    shards = []
+    id = first_live_id()
+    while id is not None:
+        shards.append(id // size)
+        id = first_live_id((shards[-1] + 1) * size)
+    return shards
+
+
+def _sitemap_index_version():
+    # ETag only: aggregating every shard's last version reads every row.
+    g.live_shards = _live_shards(current_app.config['SITEMAP_SHARD_SIZE'])
+    return ('sitemap', g.live_shards), None
+
+
+def _sitemap_version(shard):
+    size = current_app.config['SITEMAP_SHARD_SIZE']
+    g.sitemap_range = version_range(shard * size, (shard + 1) * size)
+    # ETag only: a delete can lower the shard's last version.
+    return g.sitemap_range and (('sitemap', shard, g.sitemap_range), None)
+
+
+@blog.route('/sitemap.xml')
+@conditional(_sitemap_index_version)
+def sitemap_index():
+    response = make_response(render_template(
+        'sitemap_index.xml', shards=g.live_shards))
+    response.mimetype = 'application/xml'
+    return response
+
+
+@blog.route('/sitemap/<int:shard>.xml')
+@conditional(_sitemap_version)
+def sitemap(shard):
+    if g.sitemap_range is None:
+        abort(404)
+    key = (request.host_url, g.sitemap_range)
+    body = sitemap_shards.get(key)
+    if body is None:
+        body = stream_with_context(_stream_sitemap(key))
+    return current_app.response_class(body, mimetype='application/xml')
+
+
+def _stream_sitemap(key):
+    """Yields one chunk per batch of the id keyset scan and caches the
+    whole shard once it has been sent.
+    """
+    first_id, last_id = key[1][:2]
+    chunks = ['<?xml version="1.0" encoding="UTF-8"?>\n<urlset '
+              'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    yield chunks[-1]
+    for batch in iter_versions(first_id, last_id):
+        chunks.append(''.join(
+            f'<url><loc>{escape(url_for(".article", id=id, _external=True))}'
+            f'</loc><lastmod>{atom_datetime(version)}</lastmod></url>\n'
+            for id, version in batch))
+        yield chunks[-1]
+    chunks.append('</urlset>\n')
+    yield chunks[-1]
+    sitemap_shards.set(key, ''.join(chunks))
+
+
+@blog.route('/search')
+def search():
+    query = request.args.get('q', '')
+    cursor = request.args.get('cursor', 0, type=int)
+    results, next_cursor = search_articles(query, cursor=cursor)
+    return render_template('search.html', query=query, results=results,
+                           next_cursor=next_cursor)
+
+
+@blog.app_template_filter('highlight')
+def highlight(snippet):
+    return escape(snippet) \
+        .replace(SearchResult.HIGHLIGHT_START, Markup('<mark>')) \
+        .replace(SearchResult.HIGHLIGHT_END, Markup('</mark>'))
+
+
+@blog.app_template_filter('atom_datetime')
+def atom_datetime(moment):
+    return _as_utc(moment).isoformat()
+
+
+@warmer
+def prefill_page_cache(app):
+    if not app.config['PAGE_CACHE_SIZE']:
+        return
+    client = app.test_client()
+    for page in range(app.config['PAGE_CACHE_PREFILL_PAGES']):
+        versions = page_versions(page, PAGE_COUNT)
+        with app.test_request_context():
+            urls = [url_for('blog.index', page=page)] + [
+                url_for('blog.article', id=id) for id, _ in versions]
+        for url in urls:
+            client.get(url)
+        if len(versions) < PAGE_COUNT:
+            break
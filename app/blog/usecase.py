@@ -1,11 +1,142 @@
-from .domain.registries import repos
+from ddd import profiled, single_flight
+from .domain.models import Article, ArticleCursor, Tag
+from .domain.registries import repos, services
 
 
+@profiled
 def articles_by_page(page=0, page_count=10):
-    articles = repos.article.recent_articles_of_page(page, page_count)
+    articles = repos.article.listing_page(page, page_count)
     return articles
 
 
+@profiled
+def all_tags():
+    return repos.tag.all()
+
+
+@profiled
+def save_tags(tags):
+    repos.tag.save_many(tags)
+
+
+@profiled
+def iter_articles(batch_size=500):
+    return repos.article.iter_articles(batch_size)
+
+
+@profiled
+def save_articles(articles):
+    repos.article.save_many(articles)
+
+
+def _unless_wrote(id):
+    """Coalesces lookups only among callers that have not written; one
+    that has must read its own writes from the primary by itself.
+    """
+    return None if repos.article.wrote() else id
+
+
+def _detached(article):
+    if article is None:
+        return None
+    values = {name: getattr(article, name) for name in article._attrs}
+    values['tags'] = [Tag(tag.id, tag.name) for tag in article.tags]
+    return Article(**values)
+
+
+@single_flight(key=_unless_wrote, copy=_detached)
+@profiled
 def article_by_id(id):
     article = repos.article.article(id)
     return article
+
+
+@profiled
+def recent_articles(cursor=None, limit=10, fields=None):
+    articles = repos.article.recent_articles(cursor, limit, fields)
+    next_cursor = ArticleCursor.of(articles[-1]) \
+        if len(articles) == limit else None
+    return articles, next_cursor
+
+
+@single_flight(key=_unless_wrote)
+@profiled
+def article_version(id):
+    return repos.article.version_of_article(id)
+
+
+@profiled
+def page_versions(page=0, page_count=10):
+    return repos.article.versions_of_page(page, page_count)
+
+
+@profiled
+def latest_versions(limit=10):
+    return repos.article.latest_versions(limit)
+
+
+@profiled
+def articles_of(ids):
+    return repos.article.articles_of(ids)
+
+
+@profiled
+def first_live_id(start=None):
+    return repos.article.first_live_id(start)
+
+
+@profiled
+def version_range(first_id, next_id=None):
+    return repos.article.version_range(first_id, next_id)
+
+
+@profiled
+def iter_versions(first_id, last_id):
+    return repos.article.iter_versions(first_id, last_id)
+
+
+@profiled
+def articles_by_tag(tag_id, cursor=None, limit=10):
+    articles = repos.article.articles_by_tag(tag_id, cursor, limit)
+    return articles
+
+
+@profiled
+def tags_with_counts():
+    return repos.tag.all_with_counts()
+
+
+@profiled
+def search_articles(query, limit=10, cursor=0):
+    results = repos.article.search(query, limit, cursor)
+    next_cursor = cursor + len(results) if len(results) == limit else None
+    return results, next_cursor
+
+
+@profiled
+def rebuild_listing():
+    repos.article.rebuild_listing()
+
+
+@profiled
+def rebuild_search_index():
+    repos.article.rebuild_search_index()
+
+
+@profiled
+def rerender_articles(pool_map=map, batch_size=100):
+    """Re-renders articles whose stored HTML was produced from another
+    source or renderer version, rendering each batch with ``pool_map``.
+    """
+    renderer = services.content_renderer
+    rendered = 0
+    for articles in repos.article.iter_articles(batch_size):
+        stale = [article for article in articles
+                 if article.content_key != renderer.key(article.content)]
+        sources = [article.content for article in stale]
+        for article, html in zip(stale, pool_map(renderer, sources)):
+            article.content_html = html
+            article.content_key = renderer.key(article.content)
+            repos.article.save(article)
+        rendered += len(stale)
+    return rendered
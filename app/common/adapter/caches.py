@@ -0,0 +1,96 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key, default=None):
+        try:
+            with open(self._path(key), 'rb') as file:
+                stored_key, value = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+        return value if stored_key == key else default
+
+    def set(self, key, value):
+        write_atomic(self._path(key), pickle.dumps((key, value)))
+
+    def pop(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def items(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith('.cache'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'rb') as file:
+                    yield pickle.load(file)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+
+    def clear(self):
+        for key, _ in list(self.items()):
+            self.pop(key)
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, f'{digest}.cache')
+
+
+def write_atomic(path, data):
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
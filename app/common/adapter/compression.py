@@ -0,0 +1,83 @@
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {
+    'text/html', 'text/plain', 'text/css', 'text/xml', 'application/json',
+    'application/javascript', 'application/xml', 'application/atom+xml',
+    'image/svg+xml',
+}
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def negotiate(mimetype, size):
+    """The encoding to send a ``size`` bytes ``mimetype`` body with, or
+    ``None`` if it should go out as is.
+    """
+    config = current_app.config
+    if not config['COMPRESSION'] or mimetype not in COMPRESSIBLE or \
+            size < config['COMPRESSION_MIN_SIZE']:
+        return None
+    accepted = request.accept_encodings
+    encodings = [encoding for encoding in available_encodings()
+                 if accepted[encoding]]
+    return max(encodings, key=lambda encoding: accepted[encoding],
+               default=None)
+
+
+def compress(data, encoding):
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.compress(
+            data, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    return gzip.compress(
+        data, compresslevel=config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+
+def encode_response(response, encoding, data):
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+
+
+def compress_responses(app):
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in COMPRESSIBLE:
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.status_code == 304:
+            _weaken_etag_like_request(response)
+            return response
+        if response.status_code != 200 or response.direct_passthrough or \
+                response.is_streamed:
+            return response
+        if 'Content-Encoding' not in response.headers:
+            data = response.get_data()
+            encoding = negotiate(response.mimetype, len(data))
+            if encoding is None:
+                return response
+            encode_response(response, encoding, compress(data, encoding))
+        _weaken_etag(response)
+        return response
+
+
+def _weaken_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def _weaken_etag_like_request(response):
+    etag, weak = response.get_etag()
+    if etag and not weak and request.if_none_match and \
+            not request.if_none_match.contains(etag):
+        response.set_etag(etag, weak=True)
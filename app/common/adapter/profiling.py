@@ -0,0 +1,50 @@
+import json
+
+import click
+from flask import abort, g, jsonify, request
+
+from ddd import profiler
+
+LOCAL_ADDRESSES = {'127.0.0.1', '::1'}
+
+
+def profile_memory(app):
+    """Profiles the allocations of sampled requests when MEMORY_PROFILING
+    is set. The summary is served on /_debug/memory to local clients and
+    ``flask profile-memory`` dumps one for requests it makes itself.
+    """
+    if not app.config.get('MEMORY_PROFILING'):
+        return
+    profiler.configure(app.config['MEMORY_PROFILING_SAMPLE_RATE'],
+                       app.config['MEMORY_PROFILING_HISTORY'])
+
+    @app.before_request
+    def start_profile():
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        g.memory_profile = profiler.profile(f'{request.method} {rule}')
+        g.memory_profile.__enter__()
+
+    @app.teardown_request
+    def stop_profile(error=None):
+        memory_profile = g.pop('memory_profile', None)
+        if memory_profile is not None:
+            memory_profile.__exit__(None, None, None)
+
+    @app.route('/_debug/memory')
+    def memory_summary():
+        if request.remote_addr not in LOCAL_ADDRESSES or \
+                not LOCAL_ADDRESSES.issuperset(request.access_route):
+            abort(404)
+        return jsonify(profiler.summary())
+
+    @app.cli.command('profile-memory')
+    @click.argument('urls', nargs=-1)
+    @click.option('--repeat', default=10, help='Requests per url.')
+    def profile_memory_command(urls, repeat):
+        """Requests URLS, profiling each one, and dumps the summary."""
+        profiler.configure(1.0, app.config['MEMORY_PROFILING_HISTORY'])
+        client = app.test_client()
+        for url in urls or ['/']:
+            for _ in range(repeat):
+                client.get(url)
+        click.echo(json.dumps(profiler.summary(), indent=2))
@@ -0,0 +1,106 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, \
+    request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+logger = logging.getLogger(__name__)
+
+_recorders = []
+
+
+class QueryStats:
+    def __init__(self):
+        self.statements = []
+        self.loaded = 0
+
+    def add(self, statement, duration, rows):
+        self.statements.append((statement, duration, rows))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def total_time(self):
+        return sum(duration for _, duration, _ in self.statements)
+
+    @property
+    def rows(self):
+        return sum(rows for _, _, rows in self.statements if rows > 0)
+
+    def repeated(self, threshold):
+        shapes = Counter(statement for statement, _, _ in self.statements)
+        return {statement: count for statement, count in shapes.items()
+                if count >= threshold}
+
+
+@contextmanager
+def record_queries():
+    stats = QueryStats()
+    _recorders.append(stats)
+    try:
+        yield stats
+    finally:
+        _recorders.remove(stats)
+
+
+def instrument_requests(app):
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+
+    @app.before_request
+    def start_recording():
+        g.sql_stats = QueryStats()
+
+    @app.after_request
+    def report(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+        threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+        for statement, count in stats.repeated(threshold).items():
+            logger.warning('Possible N+1 on %s: %d x %s',
+                           request.path, count, statement)
+        logger.info('%s: %d queries in %.1f ms, %d rows, %d loaded',
+                    request.path, stats.count, stats.total_time * 1000,
+                    stats.rows, stats.loaded)
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries"')
+        return response
+
+
+def _active_stats():
+    if has_request_context() and 'sql_stats' in g:
+        return [*_recorders, g.sql_stats]
+    return _recorders
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info['query_start'].pop()
+    for stats in _active_stats():
+        stats.add(statement, duration, cursor.rowcount)
+
+    if has_app_context():
+        threshold = current_app.config.get('SQL_SLOW_QUERY_THRESHOLD')
+        if threshold is not None and duration >= threshold:
+            logger.warning('Slow query (%.1f ms): %s %r',
+                           duration * 1000, statement, parameters)
+
+
+@event.listens_for(Mapper, 'load')
+def _count_loaded(target, context):
+    for stats in _active_stats():
+        stats.loaded += 1
@@ -1,3 +1,110 @@
-from flask_sqlalchemy import SQLAlchemy
+import random
+from contextlib import contextmanager
+from functools import wraps
+
+from flask_sqlalchemy import SQLAlchemy as _SQLAlchemy, SignallingSession
+from sqlalchemy import event, orm
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+
+class RoutingSession(SignallingSession):
+    def __init__(self, db, **options):
+        super().__init__(db, **options)
+        self._db = db
+        self._reading = False
+
+    @contextmanager
+    def reading(self):
+        reading, self._reading = self._reading, True
+        try:
+            yield self
+        finally:
+            self._reading = reading
+
+    def execute(self, clause, *args, **kwargs):
+        if _writes(clause):
+            self.info['wrote'] = True
+        return super().execute(clause, *args, **kwargs)
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._reading and not self._flushing and \
+                not self.info.get('wrote'):
+            replicas = self._db.get_replica_engines(self.app)
+            if replicas:
+                return random.choice(replicas)
+        return super().get_bind(mapper, clause)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _stick_to_primary(session, _):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_bulk_update')
+@event.listens_for(RoutingSession, 'after_bulk_delete')
+def _stick_to_primary_after_bulk(context):
+    context.session.info['wrote'] = True
+
+
+def _writes(clause):
+    if isinstance(clause, (str, TextClause)):
+        return str(clause).lstrip()[:6].upper() != 'SELECT'
+    return isinstance(clause, UpdateBase)
+
+
+class SQLAlchemy(_SQLAlchemy):
+    def init_app(self, app):
+        replica_uris = app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [])
+        app.config['SQLALCHEMY_BINDS'] = {
+            **(app.config.get('SQLALCHEMY_BINDS') or {}),
+            **{_replica_bind(i): uri for i, uri in enumerate(replica_uris)}
+        }
+        super().init_app(app)
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def get_replica_engines(self, app=None):
+        app = self.get_app(app)
+        return [self.get_engine(app, _replica_bind(i))
+                for i in range(len(app.config['SQLALCHEMY_REPLICA_URIS']))]
+
+
+def _replica_bind(index):
+    return f'replica_{index}'
+
 
 db = SQLAlchemy()
+
+id_sequence = db.Table(
+    'id_sequence',
+    db.Column('name', db.String(50), primary_key=True),
+    db.Column('next_value', db.BigInteger, nullable=False)
+)
+
+
+def read_only(method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with db.session().reading():
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+def apply_sqlite_pragmas(app):
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if not pragmas:
+        return
+
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    for bind in [None, *app.config['SQLALCHEMY_BINDS']]:
+        engine = db.get_engine(app, bind)
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', set_pragmas)
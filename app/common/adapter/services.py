@@ -1,27 +1,218 @@
-from datetime import datetime
-from time import sleep
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import length_hint
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from .repositories.sql import db, id_sequence
+
+EPOCH = 1514764800000
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
 
 
 def generate_unique_id():
     return _id_generator.next()
 
 
-class _IdGenerator:
-    def __init__(self):
-        self.previous = self._generate_present_timestamp()
+def generate_unique_ids(count):
+    return _id_generator.next_many(count)
+
+
+class SnowflakeIdGenerator:
+    """Ids are 41 bits of milliseconds since EPOCH, 10 bits of worker id and
+    12 bits of sequence.
+
+    The timestamp and sequence come from a logical clock, an
+    ``itertools.count`` whose ``next`` is atomic, so the hot path neither
+    locks nor sleeps. Bursts of more than 4096 ids per millisecond borrow
+    from the next milliseconds; when the clock falls behind wall time it is
+    moved forward under a lock, past every tick already handed out.
+
+    ``worker_id`` may be a callable reserving one; it is called on first
+    use and again in every forked child, so processes never share one.
+    """
+
+    def __init__(self, worker_id=0):
+        self._reserve_worker_id = worker_id if callable(worker_id) else None
+        self.worker_id = None if self._reserve_worker_id else \
+            _checked_worker_id(worker_id)
+        self._lock = threading.Lock()
+        self._clock = itertools.count(self._now())
+
+    def reset(self):
+        self._lock = threading.Lock()
+        if self._reserve_worker_id:
+            self.worker_id = None
 
     def next(self):
-        id = self._generate_present_timestamp()
-        if id == self.previous:
-            sleep(0.001)
-            id += 1
-        self.previous = id
+        clock = self._clock
+        tick = next(clock)
+        self._catch_up(clock, tick)
+        return self._compose(tick)
+
+    def next_many(self, count):
+        # Drawn under the lock so a catch-up cannot retire this clock
+        # halfway through; the gap it leaves only covers single draws.
+        with self._lock:
+            clock = self._clock
+            ticks = list(itertools.islice(clock, count))
+        if ticks:
+            self._catch_up(clock, ticks[-1])
+        return [self._compose(tick) for tick in ticks]
+
+    def _catch_up(self, clock, tick):
+        now = self._now()
+        if now - tick <= 1 << SEQUENCE_BITS:
+            return
+        with self._lock:
+            if self._clock is clock:
+                # Threads that already read the old clock may still draw
+                # one tick each from it, so leave a gap for them.
+                start = max(now, next(clock) + (1 << SEQUENCE_BITS))
+                self._clock = itertools.count(start)
+
+    def _compose(self, tick):
+        worker_id = self.worker_id
+        if worker_id is None:
+            worker_id = self._assign_worker_id()
+        timestamp = tick >> SEQUENCE_BITS
+        sequence = tick & ((1 << SEQUENCE_BITS) - 1)
+        return (timestamp << WORKER_ID_BITS | worker_id) \
+            << SEQUENCE_BITS | sequence
+
+    def _assign_worker_id(self):
+        with self._lock:
+            if self.worker_id is None:
+                self.worker_id = _checked_worker_id(self._reserve_worker_id())
+            return self.worker_id
+
+    @staticmethod
+    def _now():
+        return (int(time.time() * 1000) - EPOCH) << SEQUENCE_BITS
+
+
+class HiLoIdGenerator:
+    """Hands out ids from blocks reserved in the ``id_sequence`` table, so
+    processes sharing the database never collide. The next block is
+    reserved in the background once the current one runs low.
+    """
+
+    def __init__(self, engine, name='default', block_size=1000,
+                 prefetch_ratio=0.1):
+        self._engine = engine
+        self.name = name
+        self.block_size = block_size
+        self._low_water = int(block_size * prefetch_ratio)
+        self._lock = threading.Lock()
+        self._clear()
+
+    def reset(self):
+        """Starts a forked child over: the parent may have held the lock
+        across a reservation, and its pooled connections stay its own.
+        """
+        self._lock = threading.Lock()
+        # What Engine.dispose(close=False) does on SQLAlchemy 1.4.
+        self._engine.pool = self._engine.pool.recreate()
+        self._clear()
+
+    def _clear(self):
+        self._ids = iter(())
+        self._prefetched = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def next(self):
+        ids = self._ids
+        try:
+            id = next(ids)
+        except StopIteration:
+            return self._next_block(ids)
+        if self._prefetched is None and length_hint(ids) <= self._low_water:
+            self._prefetch()
         return id
 
-    def _generate_present_timestamp(self):
-        return int(datetime.now().timestamp() * 1000)
+    def next_many(self, count):
+        return [self.next() for _ in range(count)]
+
+    def _prefetch(self):
+        with self._lock:
+            if self._prefetched is None:
+                self._prefetched = self._executor.submit(self._reserve)
+
+    def _next_block(self, exhausted):
+        with self._lock:
+            if self._ids is exhausted:
+                prefetched, self._prefetched = self._prefetched, None
+                start = prefetched.result() if prefetched else self._reserve()
+                self._ids = iter(range(start, start + self.block_size))
+        return self.next()
+
+    def _reserve(self):
+        return _advance(self._engine, self.name, self.block_size) - \
+            self.block_size
+
+
+def reserve_worker_id(engine, name='snowflake_worker'):
+    """Takes the next worker id, round robin, from the ``id_sequence``
+    table.
+    """
+    return (_advance(engine, name, 1) - 2) % (1 << WORKER_ID_BITS)
+
+
+_advance_sequence = text(
+    'UPDATE id_sequence SET next_value = next_value + :size '
+    'WHERE name = :name RETURNING next_value')
+
+
+def _advance(engine, name, size):
+    """Advances the ``name`` sequence by ``size``, creating it at 1, and
+    returns its new next value.
+    """
+    with engine.begin() as conn:
+        end = conn.execute(_advance_sequence, name=name, size=size).scalar()
+    if end is not None:
+        return end
+    try:
+        with engine.begin() as conn:
+            conn.execute(id_sequence.insert().values(name=name, next_value=1))
+    except IntegrityError:
+        pass
+    return _advance(engine, name, size)
+
+
+def _checked_worker_id(worker_id):
+    if not 0 <= worker_id < 1 << WORKER_ID_BITS:
+        raise ValueError(f'Worker id out of range: {worker_id}')
+    return worker_id
+
+
+_id_generator = SnowflakeIdGenerator()
+
+
+def init_app(app):
+    global _id_generator
+    engine = db.get_engine(app)
+    if app.config.get('ID_GENERATOR') == 'hilo':
+        _id_generator = HiLoIdGenerator(
+            engine, block_size=app.config.get('ID_BLOCK_SIZE', 1000))
+    else:
+        worker_id = app.config.get('ID_WORKER_ID')
+        _id_generator = SnowflakeIdGenerator(
+            (lambda: reserve_worker_id(engine)) if worker_id is None
+            else worker_id)
+
+
+def _reset_after_fork():
+    reset = getattr(_id_generator, 'reset', None)
+    if reset:
+        reset()
+
 
+os.register_at_fork(after_in_child=_reset_after_fork)
 
-_id_generator = _IdGenerator()
 
-__all__ = ['generate_unique_id']
+__all__ = ['generate_unique_id', 'generate_unique_ids']
@@ -0,0 +1,67 @@
+import logging
+import os
+
+import click
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.orm import configure_mappers
+
+from .repositories.sql import db
+
+logger = logging.getLogger(__name__)
+
+_warmers = []
+
+
+def warmer(func):
+    """Registers ``func(app)`` to run at the end of :func:`warmup`."""
+    _warmers.append(func)
+    return func
+
+
+def init_app(app):
+    directory = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_options = {**app.jinja_options,
+                             'bytecode_cache': FileSystemBytecodeCache(
+                                 directory)}
+
+    @app.cli.command('warmup')
+    def warmup_command():
+        click.echo('Warmed up {templates} templates, '
+                   '{connections} connections.'.format(**warmup(app)))
+
+
+def warmup(app, prefork=True):
+    """Does the work the first requests of a new worker would otherwise
+    pay for. With ``prefork`` the pools are disposed afterwards so forked
+    workers open their own connections.
+    """
+    with app.app_context():
+        templates = [app.jinja_env.get_template(name)
+                     for name in app.jinja_env.list_templates()]
+        configure_mappers()
+        engines = [db.get_engine(app, bind)
+                   for bind in [None, *app.config['SQLALCHEMY_BINDS']]]
+        connections = sum(_validate_pool(engine) for engine in engines)
+        for warm in _warmers:
+            warm(app)
+        db.session.remove()
+        if prefork:
+            for engine in engines:
+                engine.dispose()
+    logger.info('warmed up %d templates and %d connections',
+                len(templates), connections)
+    return {'templates': len(templates), 'connections': connections}
+
+
+def _validate_pool(engine):
+    size = getattr(engine.pool, 'size', lambda: 1)()
+    connections = [engine.connect() for _ in range(size)]
+    try:
+        for connection in connections:
+            connection.scalar(db.select([1]))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
@@ -9,3 +9,7 @@ class Id(ValueObject):
     @classmethod
     def next(cls):
         return cls(services.generate_unique_id())
+
+    @classmethod
+    def next_many(cls, count):
+        return [cls(value) for value in services.generate_unique_ids(count)]
@@ -0,0 +1,14 @@
+from app import create_app
+from config import _engine_options
+
+
+def create_benchmark_app(path, **config_overrides):
+    """A testing app on the SQLite file at ``path`` with SQL
+    instrumentation off, so it does not skew timings.
+    """
+    uri = f'sqlite:///{path}'
+    return create_app('testing', **{
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': _engine_options(uri),
+        'SQL_INSTRUMENTATION': False,
+        **config_overrides})
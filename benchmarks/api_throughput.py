@@ -0,0 +1,65 @@
+"""Requests per second of the JSON API against the HTML views they
+mirror, served through the test client from a seeded SQLite file.
+
+    python -m benchmarks.api_throughput [--articles 1000] [--seconds 3]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app.common.adapter.repositories.sql import db
+from benchmarks import create_benchmark_app
+from benchmarks.seed import seed
+
+URLS = {
+    'html_index': '/',
+    'api_articles': '/api/articles?limit=10',
+    'api_articles_full': '/api/articles?limit=10&fields=id,title,content',
+    'html_article': '/article/1/',
+    'api_article': '/api/articles/1',
+}
+
+
+def throughput(client, url, seconds):
+    requests = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status)
+        response.get_data()
+        requests += 1
+    return requests / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--page-cache', action='store_true',
+                        help='Serve the HTML views from the page cache.')
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    app = create_benchmark_app(
+        path, PAGE_CACHE_SIZE=512 if args.page_cache else 0)
+    try:
+        with app.app_context():
+            db.create_all()
+            seed(args.articles)
+            client = app.test_client()
+            result = {name: throughput(client, url, args.seconds)
+                      for name, url in URLS.items()}
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Multi-threaded load driver for a seeded SQLite file, see
+``benchmarks.seed``. Each thread drives its own Flask test client and
+picks a route at random. Route ``<id>`` placeholders are filled with
+random live article ids.
+
+    python -m benchmarks.load blog.sqlite [--threads 8] [--seconds 10]
+        [--route / --route /article/<id>/] [--output result.json]
+
+Prints a JSON report with requests/s and p50/p95/p99 latency in
+milliseconds for each route.
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from app.blog.usecase import iter_versions
+from benchmarks import create_benchmark_app
+
+ROUTES = ('/', '/article/<id>/')
+
+
+def percentile(ordered, percent):
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1,
+                      round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def live_ids():
+    return [id for batch in iter_versions(0, sys.maxsize) for id, _ in batch]
+
+
+def drive(app, routes, ids, threads, seconds, seed=0):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def run(rng):
+        client = app.test_client()
+        local, failed = defaultdict(list), defaultdict(int)
+        while time.perf_counter() < deadline:
+            route = rng.choice(routes)
+            url = route.replace('<id>', str(rng.choice(ids)))
+            start = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            elapsed = time.perf_counter() - start
+            if response.status_code == 200:
+                local[route].append(elapsed)
+            else:
+                failed[route] += 1
+        with lock:
+            for route, values in local.items():
+                latencies[route].extend(values)
+            for route, count in failed.items():
+                errors[route] += count
+
+    workers = [threading.Thread(target=run, args=(random.Random(seed + i),))
+               for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return {route: _summary(sorted(latencies[route]), errors[route], seconds)
+            for route in routes}
+
+
+def _summary(ordered, errors, seconds):
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'rps': len(ordered) / seconds,
+        **{f'p{percent}_ms': percentile(ordered, percent) * 1000
+           if ordered else None for percent in (50, 95, 99)},
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--route', action='append', dest='routes')
+    parser.add_argument('--page-cache-size', type=int, default=0)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    routes = args.routes or list(ROUTES)
+
+    app = create_benchmark_app(args.path,
+                               PAGE_CACHE_SIZE=args.page_cache_size)
+    with app.app_context():
+        ids = live_ids()
+    report = {
+        'commit': _commit(),
+        'threads': args.threads,
+        'seconds': args.seconds,
+        'articles': len(ids),
+        'page_cache_size': args.page_cache_size,
+        'routes': drive(app, routes, ids, args.threads, args.seconds),
+    }
+    result = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(result + '\n')
+    print(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Seeds a SQLite file with a synthetic blog through the repos.
+
+Tag popularity follows a Zipf-like curve and most articles carry one to
+three tags, so tag pages and counts see a realistic skew.
+
+    python -m benchmarks.seed blog.sqlite [--articles 1000] [--tags 50]
+"""
+import argparse
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from app.blog.domain.models import Article, ArticleId, Author, Tag, TagId
+from app.blog.domain.registries import repos
+from app.common.adapter.repositories.sql import db
+from benchmarks import create_benchmark_app
+
+WORDS = ('domain', 'entity', 'value', 'object', 'repository', 'service',
+         'flask', 'query', 'index', 'cache', 'latency', 'throughput',
+         'python', 'sqlite', 'render', 'template', 'worker', 'request')
+START = datetime(year=2018, month=1, day=1)
+
+
+def seed(article_count, tag_count=0, rng=None):
+    rng = rng or random.Random(0)
+    tags = [Tag(TagId(id), f'tag-{id}') for id in range(1, tag_count + 1)]
+    for tag in tags:
+        repos.tag.save(tag)
+    weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, tag_count + 1)))
+    for id in range(1, article_count + 1):
+        tag_number = min(tag_count, _tag_number(rng))
+        article_tags = set()
+        while len(article_tags) < tag_number:
+            article_tags.add(rng.choices(tags, cum_weights=weights)[0])
+        repos.article.save(Article(
+            ArticleId(id), _sentence(rng, 6).title(),
+            '\n\n'.join(_sentence(rng, 80) for _ in range(rng.randint(3, 12))),
+            Author(1, 'psyche'), START + timedelta(hours=id),
+            START + timedelta(hours=id, days=rng.randint(1, 30))
+            if rng.random() < 0.2 else None, None,
+            tags=sorted(article_tags, key=lambda tag: tag.id.value)))
+
+
+def _tag_number(rng):
+    return rng.choices((0, 1, 2, 3, 4, 5), (5, 35, 30, 18, 8, 4))[0]
+
+
+def _sentence(rng, length):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path')
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--tags', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    app = create_benchmark_app(args.path)
+    with app.app_context():
+        db.create_all()
+        seed(args.articles, args.tags, random.Random(args.seed))
+        db.session.remove()
+    print(f'Seeded {args.articles} articles and {args.tags} tags '
+          f'into {args.path}.')
+
+
+if __name__ == '__main__':
+    main()
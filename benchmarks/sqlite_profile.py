@@ -0,0 +1,102 @@
+"""Concurrent read/write throughput of SQLite with and without the pragma
+profile from ``config.Config.SQLITE_PRAGMAS``.
+
+    python -m benchmarks.sqlite_profile [--seconds 5] [--readers 4]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.blog.adapter.repositories.sql.tables import article
+from config import Config
+
+
+def make_engine(path, profile):
+    if not profile:
+        return create_engine(f'sqlite:///{path}', poolclass=NullPool)
+
+    engine = create_engine(f'sqlite:///{path}', poolclass=QueuePool,
+                           pool_size=8, max_overflow=0,
+                           connect_args={'check_same_thread': False})
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, _):
+        for name, value in Config.SQLITE_PRAGMAS.items():
+            dbapi_connection.execute(f'PRAGMA {name}={value}')
+
+    return engine
+
+
+def run(profile, seconds, readers):
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    engine = make_engine(path, profile)
+    article.metadata.create_all(engine, tables=[article])
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def count(kind):
+        with lock:
+            counts[kind] += 1
+
+    def write():
+        next_id = 0
+        while time.perf_counter() < deadline:
+            next_id += 1
+            try:
+                with engine.begin() as conn:
+                    conn.execute(article.insert().values({
+                        '__id': next_id, 'title': f'title {next_id}',
+                        'content': 'x' * 2000, '__author_id': 1,
+                        '__author_name': 'psyche',
+                        'created_at': datetime.now()}))
+                count('writes')
+            except Exception:
+                count('errors')
+
+    def read():
+        query = select([func.count()]).select_from(article)
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(query).scalar()
+                count('reads')
+            except Exception:
+                count('errors')
+
+    threads = [threading.Thread(target=write)] + [
+        threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return {kind: value / seconds if kind != 'errors' else value
+            for kind, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+    result = {
+        'default': run(False, args.seconds, args.readers),
+        'profile': run(True, args.seconds, args.readers),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
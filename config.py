@@ -1,31 +1,95 @@
 import os
 
+from sqlalchemy.pool import QueuePool
+
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 
+def _engine_options(database_uri):
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+    if database_uri.startswith('sqlite'):
+        options['poolclass'] = QueuePool
+        options['connect_args'] = {'check_same_thread': False}
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'Yes. I am ready.'
     DEBUG = False
     TESTING = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_REPLICA_URIS = []
+    DDD_REPOSITORY_BACKEND = os.environ.get('DDD_REPOSITORY_BACKEND')
+    DDD_EVENTS_SYNC = False
+    DDD_EVENT_WORKERS = 2
+    DDD_EVENT_QUEUE_SIZE = 1000
+    DDD_EVENT_RETRIES = 3
+    MEMORY_REPOSITORY_SNAPSHOT = True
+    ID_GENERATOR = os.environ.get('ID_GENERATOR', 'snowflake')
+    # Unset, every process reserves its own; set, it must run alone.
+    ID_WORKER_ID = int(os.environ['ID_WORKER_ID']) \
+        if os.environ.get('ID_WORKER_ID') else None
+    ID_BLOCK_SIZE = 1000
+    WARMUP = bool(os.environ.get('WARMUP'))
+    TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    PAGE_CACHE_SIZE = 512
+    PAGE_CACHE_PREFILL_PAGES = 1
+    PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR')
+    COMPRESSION = True
+    COMPRESSION_MIN_SIZE = 500
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+    FEED_ENTRY_LIMIT = 20
+    SITEMAP_SHARD_SIZE = 50000
+    SQL_INSTRUMENTATION = False
+    SQL_SLOW_QUERY_THRESHOLD = 0.1
+    SQL_N_PLUS_ONE_THRESHOLD = 5
+    MEMORY_PROFILING = bool(os.environ.get('MEMORY_PROFILING'))
+    MEMORY_PROFILING_SAMPLE_RATE = float(
+        os.environ.get('MEMORY_PROFILING_SAMPLE_RATE', 0.01))
+    MEMORY_PROFILING_HISTORY = 200
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'memory',
+    }
 
 
 class Dev(Config):
     DEBUG = True
+    SQL_INSTRUMENTATION = True
     SQLALCHEMY_DATABASE_URI = \
         f'sqlite:///{os.path.join(basedir, "data-dev.sqlite")}'
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class Prod(Config):
     SQLALCHEMY_DATABASE_URI = \
         os.environ.get('DATABASE_URL') or \
         f'sqlite:///{os.path.join(basedir, "data.sqlite")}'
+    SQLALCHEMY_REPLICA_URIS = [
+        uri for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',')
+        if uri]
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class Testing(Config):
     TESTING = True
+    ID_WORKER_ID = 0
+    DDD_EVENTS_SYNC = True
+    SQL_INSTRUMENTATION = True
     SQLALCHEMY_DATABASE_URI = \
         f'sqlite:///{os.path.join(basedir, "data-test.sqlite")}'
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 config = {
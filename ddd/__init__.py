@@ -1,3 +1,6 @@
 from .domains import DomainModel, ValueObject, Entity, Repo, Registry
+from .events import DomainEvent, Dispatcher, dispatcher
 from .make import Attr
+from .profiling import AllocationProfiler, profiled, profiler
+from .singleflight import SingleFlight, single_flight
 from .validators import *
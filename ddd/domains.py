@@ -112,6 +112,12 @@ class Entity(DomainModel):
     def __hash__(self):
         return hash(self.id)
 
+    def record(self, event):
+        self.__dict__.setdefault('_events', []).append(event)
+
+    def pull_events(self):
+        return self.__dict__.pop('_events', [])
+
 
 class ValueObject(DomainModel):
     __frozen__ = True
@@ -137,7 +143,17 @@ class ValueObject(DomainModel):
 
 
 class Repo(abc.ABC):
-    pass
+    @classmethod
+    def listen(cls, listener):
+        if '_listeners' not in cls.__dict__:
+            cls._listeners = []
+        cls._listeners.append(listener)
+        return listener
+
+    def _notify(self, model):
+        for cls in type(self).__mro__:
+            for listener in cls.__dict__.get('_listeners', ()):
+                listener(model)
 
 
 class Registry:
@@ -0,0 +1,160 @@
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from .domains import ValueObject
+
+logger = logging.getLogger(__name__)
+
+
+class DomainEvent(ValueObject):
+    pass
+
+
+class DispatcherMetrics:
+    def __init__(self):
+        self.published = 0
+        self.handled = 0
+        self.retried = 0
+        self.failed = 0
+        self.caller_runs = 0
+        self.max_depth = 0
+
+    def _asdict(self):
+        return dict(vars(self))
+
+
+class Dispatcher:
+    """Runs the handlers subscribed to an event's type and its bases.
+
+    Asynchronously, events go through a bounded queue drained by worker
+    threads; when the queue is full the publisher runs the handlers
+    itself, which pushes back on the write path. ``sync`` runs every
+    handler inline, as tests want.
+    """
+
+    def __init__(self, workers=2, queue_size=1000, retries=3,
+                 retry_delay=0.1, sync=False):
+        self._handlers = defaultdict(list)
+        self._lock = threading.Lock()
+        self._threads = []
+        self.configure(workers, queue_size, retries, retry_delay, sync)
+        _dispatchers.add(self)
+
+    def configure(self, workers=2, queue_size=1000, retries=3,
+                  retry_delay=0.1, sync=False):
+        self.shutdown()
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.sync = sync
+        self.metrics = DispatcherMetrics()
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def subscribe(self, event_type, handler=None):
+        if handler is None:
+            return lambda handler: self.subscribe(event_type, handler)
+        self._handlers[event_type].append(handler)
+        return handler
+
+    def publish(self, *events):
+        for event in events:
+            with self._lock:
+                self.metrics.published += 1
+            if self.sync:
+                self._handle(event)
+                continue
+            self._start()
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                with self._lock:
+                    self.metrics.caller_runs += 1
+                self._handle(event)
+            else:
+                with self._lock:
+                    self.metrics.max_depth = max(self.metrics.max_depth,
+                                                 self._queue.qsize())
+
+    def join(self):
+        """Blocks until every queued event has been handled."""
+        self._queue.join()
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def shutdown(self):
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def reset(self):
+        """Forgets the worker threads, queue and lock a forked child
+        inherits; the events queued before the fork stay the parent's.
+        """
+        self._lock = threading.Lock()
+        self._threads = []
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+
+    def _start(self):
+        if self._threads:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self._handle(event)
+            finally:
+                self._queue.task_done()
+
+    def _handle(self, event):
+        for event_type in type(event).__mro__:
+            for handler in self._handlers.get(event_type, ()):
+                self._run(handler, event)
+
+    def _run(self, handler, event):
+        for attempt in range(self.retries + 1):
+            try:
+                handler(event)
+            except Exception:
+                if attempt == self.retries:
+                    with self._lock:
+                        self.metrics.failed += 1
+                    logger.exception('handler %r failed on %r',
+                                     handler, event)
+                    return
+                with self._lock:
+                    self.metrics.retried += 1
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                with self._lock:
+                    self.metrics.handled += 1
+                return
+
+
+_dispatchers = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for instance in list(_dispatchers):
+        instance.reset()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+dispatcher = Dispatcher()
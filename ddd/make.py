@@ -156,8 +156,9 @@ class ModelMeta(type):
             elif not had_default and not attr.is_required:
                 had_default = True
 
-            if (attr.type and attr.default.is_defined) and not isinstance(
-                    attr.default(), attr.type):
+            if (attr.type and attr.default.is_defined) and not (
+                    isinstance(attr.default(), attr.type) or
+                    attr.allow_none and attr.default() is None):
                 raise ValueError(
                     f'Incorrect attribute type and default value: {attr.name}')
 
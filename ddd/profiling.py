@@ -0,0 +1,190 @@
+import random
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+
+class _Frame:
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.peak = start
+        self.calls = []
+
+
+class AllocationProfiler:
+    """Samples a fraction of units of work (requests, jobs) and records
+    with ``tracemalloc`` how much each allocated: net bytes still held at
+    the end, peak bytes above the start, and the net bytes per module.
+    Calls wrapped in :func:`profiled` inside a sampled unit are measured
+    too.
+
+    Tracing only runs while a sampled unit does, and one unit is sampled
+    at a time, which bounds the overhead. Allocations other threads make
+    meanwhile are counted against that unit.
+    """
+
+    def __init__(self, sample_rate=0.0, history=200):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.configure(sample_rate, history)
+
+    def configure(self, sample_rate=0.0, history=200):
+        self.sample_rate = sample_rate
+        self.records = deque(maxlen=history)
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    @contextmanager
+    def profile(self, name):
+        sampled = random.random() < self.sample_rate and \
+            self._lock.acquire(blocking=False)
+        if not sampled:
+            yield None
+            return
+        started = not tracemalloc.is_tracing()
+        self._local.frames = []
+        try:
+            if started:
+                tracemalloc.start()
+                before = None
+            else:
+                before = tracemalloc.take_snapshot()
+            with self._measure(name) as frame:
+                yield frame
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__),
+                 tracemalloc.Filter(False, __file__)])
+            self.records.append(_record(frame, _by_module(snapshot, before)))
+        finally:
+            self._local.frames = None
+            if started:
+                tracemalloc.stop()
+            self._lock.release()
+
+    @contextmanager
+    def measure(self, name):
+        if getattr(self._local, 'frames', None):
+            with self._measure(name) as frame:
+                yield frame
+        else:
+            yield None
+
+    @contextmanager
+    def _measure(self, name):
+        frames = self._local.frames
+        self._fold_peak()
+        tracemalloc.reset_peak()
+        frame = _Frame(name, tracemalloc.get_traced_memory()[0])
+        if frames:
+            frames[-1].calls.append(frame)
+        frames.append(frame)
+        try:
+            yield frame
+        finally:
+            self._fold_peak()
+            frames.pop()
+            frame.net = tracemalloc.get_traced_memory()[0] - frame.start
+
+    def _fold_peak(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._local.frames:
+            frame.peak = max(frame.peak, peak)
+
+    def summary(self):
+        """Averages the recorded samples per unit name, per profiled call
+        name and per module.
+        """
+        units, calls, modules = {}, {}, {}
+        for record in self.records:
+            _accumulate(units, record)
+            for call in _walk(record['calls']):
+                _accumulate(calls, call)
+            for module, size in record['modules'].items():
+                modules[module] = modules.get(module, 0) + size
+        samples = len(self.records)
+        return {
+            'samples': samples,
+            'units': _averages(units),
+            'calls': _averages(calls),
+            'modules': {module: size // samples for module, size in
+                        sorted(modules.items(), key=lambda item: -item[1])},
+        }
+
+
+def _record(frame, modules=None):
+    record = {'name': frame.name, 'net': frame.net,
+              'peak': frame.peak - frame.start,
+              'calls': [_record(call) for call in frame.calls]}
+    if modules is not None:
+        record['modules'] = modules
+    return record
+
+
+def _walk(calls):
+    for call in calls:
+        yield call
+        yield from _walk(call['calls'])
+
+
+def _accumulate(totals, record):
+    total = totals.setdefault(record['name'], [0, 0, 0])
+    total[0] += 1
+    total[1] += record['net']
+    total[2] = max(total[2], record['peak'])
+
+
+def _averages(totals):
+    return {name: {'count': count, 'net': net // count, 'peak': peak}
+            for name, (count, net, peak) in totals.items()}
+
+
+def _by_module(snapshot, before=None):
+    if before is None:
+        stats = [(stat.traceback[0].filename, stat.size)
+                 for stat in snapshot.statistics('filename')]
+    else:
+        stats = [(stat.traceback[0].filename, stat.size_diff)
+                 for stat in snapshot.compare_to(before, 'filename')]
+    modules = _modules_by_file()
+    sizes = {}
+    for filename, size in stats:
+        module = _group(modules.get(filename), filename)
+        sizes[module] = sizes.get(module, 0) + size
+    return sizes
+
+
+def _modules_by_file():
+    return {getattr(module, '__file__', None): name
+            for name, module in list(sys.modules.items())}
+
+
+def _group(module, filename):
+    """``app.<context>.<layer>`` for the application, the top level
+    package otherwise, and ``templates`` for compiled Jinja templates.
+    """
+    if module is None:
+        if filename.endswith(('.html', '.xml', '.txt')):
+            return 'templates'
+        return '<unknown>'
+    parts = module.split('.')
+    return '.'.join(parts[:3] if parts[0] == 'app' else parts[:1])
+
+
+def profiled(func):
+    """Measures calls of ``func`` made inside a sampled unit of work."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with profiler.measure(f'{func.__module__}.{func.__qualname__}'):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+profiler = AllocationProfiler()
@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import threading
+
+
+class FlightMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _asdict(self):
+        return dict(vars(self))
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+        self.copies = []
+
+
+class SingleFlight:
+    """Runs at most one call of ``func`` per key at a time; callers that
+    arrive while it is in flight wait for it and share its result, or
+    its exception. Nothing is kept once the call returns.
+
+    Coroutine functions are coalesced per event loop. Callers share the
+    very same result object, so it must be safe to read concurrently,
+    unless ``copy(result)`` gives each waiting caller one of its own.
+    A call whose key is None runs alone.
+    """
+
+    def __init__(self, func, key=None, copy=None):
+        self.func = func
+        self.key = key or _default_key
+        self.copy = copy
+        self.metrics = FlightMetrics()
+        self._lock = threading.Lock()
+        self._calls = {}
+        functools.update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        if asyncio.iscoroutinefunction(self.func):
+            return self._call_async(*args, **kwargs)
+        key = self.key(*args, **kwargs)
+        if key is None:
+            with self._lock:
+                self.metrics.calls += 1
+                self.metrics.executions += 1
+            return self.func(*args, **kwargs)
+        with self._lock:
+            self.metrics.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.metrics.executions += 1
+            else:
+                call.followers += 1
+                self.metrics.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.copies.pop() if self.copy else call.result
+        try:
+            result = call.result = self.func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if self.copy and call.error is None:
+                self._copy_for_followers(call)
+            call.done.set()
+        return result
+
+    def _copy_for_followers(self, call):
+        try:
+            call.copies = [self.copy(call.result)
+                           for _ in range(call.followers)]
+        except BaseException as e:
+            call.error = e
+
+    async def _call_async(self, *args, **kwargs):
+        key = self.key(*args, **kwargs)
+        if key is None:
+            with self._lock:
+                self.metrics.calls += 1
+                self.metrics.executions += 1
+            return await self.func(*args, **kwargs)
+        key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            self.metrics.calls += 1
+            task = self._calls.get(key)
+            leader = task is None
+            if leader:
+                task = self._calls[key] = asyncio.ensure_future(
+                    self.func(*args, **kwargs))
+                task.add_done_callback(lambda _: self._forget(key))
+                self.metrics.executions += 1
+            else:
+                self.metrics.coalesced += 1
+        result = await asyncio.shield(task)
+        return self.copy(result) if self.copy and not leader else result
+
+    def _forget(self, key):
+        with self._lock:
+            self._calls.pop(key, None)
+
+
+def single_flight(func=None, *, key=None, copy=None):
+    """Decorator form of :class:`SingleFlight`, keyed by the call's
+    arguments unless ``key(*args, **kwargs)`` says otherwise.
+    """
+    if func is None:
+        return lambda func: SingleFlight(func, key, copy)
+    return SingleFlight(func, key, copy)
+
+
+def _default_key(*args, **kwargs):
+    return args, frozenset(kwargs.items())
@@ -165,18 +165,23 @@ class TestValueObject:
             b = Attr(allow_none=True)
             c: int = Attr(allow_none=True)
             d: tuple = Attr(allow_none=True, default=tuple)
+            e: int = Attr(allow_none=True, default=None)
 
         with pytest.raises(ValueError):
             AVO(None, 1, 2)
 
+        with pytest.raises(ValueError):
+            class BVO(ValueObject):
+                a: int = Attr(default=None)
+
         avo = AVO(1, None, 2)
-        assert tuple(avo) == (1, None, 2, ())
+        assert tuple(avo) == (1, None, 2, (), None)
 
         avo = AVO(1, 2, None)
-        assert tuple(avo) == (1, 2, None, ())
+        assert tuple(avo) == (1, 2, None, (), None)
 
-        avo = AVO(1, 2, 3, None)
-        assert tuple(avo) == (1, 2, 3, None)
+        avo = AVO(1, 2, 3, None, 4)
+        assert tuple(avo) == (1, 2, 3, None, 4)
 
     def test_hash(self):
         class AVO(ValueObject):
@@ -0,0 +1,126 @@
+import os
+import threading
+
+import pytest
+
+from ddd import Attr, Dispatcher, DomainEvent, Entity
+
+
+class Saved(DomainEvent):
+    id = Attr()
+
+
+class Renamed(Saved):
+    name = Attr()
+
+
+class AnEntity(Entity):
+    id = Attr()
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = Dispatcher(workers=2, queue_size=10, retries=2,
+                            retry_delay=0)
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+class TestEntity:
+    def test_record_and_pull(self):
+        entity = AnEntity(1)
+        entity.record(Saved(1))
+        entity.record(Saved(2))
+        assert entity.pull_events() == [Saved(1), Saved(2)]
+        assert entity.pull_events() == []
+
+
+class TestDispatcher:
+    def test_sync(self, dispatcher):
+        dispatcher.configure(sync=True)
+        handled = []
+        dispatcher.subscribe(Saved, handled.append)
+        dispatcher.publish(Saved(1), Renamed(2, 'x'))
+        assert handled == [Saved(1), Renamed(2, 'x')]
+        assert dispatcher.metrics.handled == 2
+
+    def test_subscribe_decorator(self, dispatcher):
+        handled = []
+
+        @dispatcher.subscribe(Renamed)
+        def handler(event):
+            handled.append(event)
+
+        dispatcher.publish(Saved(1), Renamed(2, 'x'))
+        dispatcher.join()
+        assert handled == [Renamed(2, 'x')]
+
+    def test_runs_off_the_publishing_thread(self, dispatcher):
+        threads = []
+        dispatcher.subscribe(
+            Saved, lambda event: threads.append(threading.current_thread()))
+        dispatcher.publish(Saved(1))
+        dispatcher.join()
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_retries(self, dispatcher):
+        attempts = []
+
+        def flaky(event):
+            attempts.append(event)
+            if len(attempts) < 2:
+                raise RuntimeError
+
+        dispatcher.subscribe(Saved, flaky)
+        dispatcher.publish(Saved(1))
+        dispatcher.join()
+        assert len(attempts) == 2
+        assert dispatcher.metrics._asdict() == {
+            'published': 1, 'handled': 1, 'retried': 1, 'failed': 0,
+            'caller_runs': 0, 'max_depth': dispatcher.metrics.max_depth}
+
+    def test_gives_up(self, dispatcher):
+        def broken(event):
+            raise RuntimeError
+
+        dispatcher.subscribe(Saved, broken)
+        dispatcher.publish(Saved(1))
+        dispatcher.join()
+        assert dispatcher.metrics.retried == 2
+        assert dispatcher.metrics.failed == 1
+
+    def test_caller_runs_when_full(self, dispatcher):
+        dispatcher.configure(workers=1, queue_size=1)
+        release = threading.Event()
+        handled = []
+
+        def slow(event):
+            if event.id == 1:
+                release.wait(5)
+            handled.append(event)
+
+        dispatcher.subscribe(Saved, slow)
+        dispatcher.publish(Saved(1))
+        while dispatcher.depth:
+            pass
+        dispatcher.publish(Saved(2), Saved(3))
+        release.set()
+        dispatcher.join()
+        assert dispatcher.metrics.caller_runs == 1
+        assert sorted(event.id for event in handled) == [1, 2, 3]
+
+    def test_forked_child_starts_its_own_workers(self, dispatcher):
+        handled = threading.Event()
+        dispatcher.subscribe(Saved, lambda event: handled.set())
+        dispatcher.publish(Saved(1))
+        dispatcher.join()
+        handled.clear()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                dispatcher.publish(Saved(2))
+                os._exit(0 if handled.wait(5) else 1)
+            finally:
+                os._exit(2)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
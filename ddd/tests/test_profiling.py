@@ -0,0 +1,40 @@
+from ddd import AllocationProfiler
+
+
+class TestAllocationProfiler:
+    def test_profile_and_measure(self):
+        profiler = AllocationProfiler(sample_rate=1.0)
+        held = []
+        with profiler.profile('unit'):
+            with profiler.measure('outer'):
+                held.append(bytearray(100000))
+                with profiler.measure('inner'):
+                    bytearray(200000)
+        record, = profiler.records
+        assert record['net'] >= 100000
+        assert record['peak'] >= 300000
+        outer, = record['calls']
+        assert outer['name'] == 'outer'
+        assert outer['net'] >= 100000
+        inner, = outer['calls']
+        assert inner['peak'] >= 200000 > inner['net']
+        assert 'ddd' in record['modules']
+
+        summary = profiler.summary()
+        assert summary['samples'] == 1
+        assert set(summary['calls']) == {'outer', 'inner'}
+
+    def test_measure_outside_profile(self):
+        profiler = AllocationProfiler(sample_rate=1.0)
+        with profiler.measure('alone') as frame:
+            pass
+        assert frame is None
+        assert not profiler.records
+
+    def test_sample_rate(self):
+        profiler = AllocationProfiler(sample_rate=0.0)
+        with profiler.profile('unit') as frame:
+            pass
+        assert frame is None
+        assert profiler.summary() == {
+            'samples': 0, 'units': {}, 'calls': {}, 'modules': {}}
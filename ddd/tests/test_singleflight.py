@@ -0,0 +1,138 @@
+import asyncio
+import threading
+
+import pytest
+
+from ddd import single_flight
+
+
+class TestSingleFlight:
+    def test_coalesces_concurrent_calls(self):
+        release = threading.Event()
+        executed = []
+
+        @single_flight
+        def load(id):
+            executed.append(id)
+            release.wait(5)
+            return {'id': id}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(load(1)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while load.metrics.calls < 5:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert executed == [1]
+        assert all(result is results[0] for result in results)
+        assert load.metrics._asdict() == {
+            'calls': 5, 'executions': 1, 'coalesced': 4}
+
+    def test_keyed_by_arguments(self):
+        @single_flight
+        def load(id, deleted=False):
+            return id, deleted
+
+        assert load(1) == (1, False)
+        assert load(1, deleted=True) == (1, True)
+        assert load(2) == (2, False)
+        assert load.metrics.executions == 3
+        assert load.__name__ == 'load'
+
+    def test_shares_exception(self):
+        release = threading.Event()
+
+        @single_flight(key=lambda id: id)
+        def load(id):
+            release.wait(5)
+            raise LookupError(id)
+
+        errors = []
+
+        def call():
+            try:
+                load(1)
+            except LookupError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while load.metrics.calls < 3:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(errors) == 3
+        assert load.metrics.coalesced == 2
+        with pytest.raises(LookupError):
+            load(1)
+        assert load.metrics.executions == 2
+
+    def test_copies_for_followers(self):
+        release = threading.Event()
+
+        @single_flight(copy=dict)
+        def load(id):
+            release.wait(5)
+            return {'id': id}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(load(1)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while load.metrics.calls < 3:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert results == [{'id': 1}] * 3
+        assert len({id(result) for result in results}) == 3
+        assert load.metrics.coalesced == 2
+
+    def test_none_key_runs_alone(self):
+        release = threading.Event()
+        executed = []
+
+        @single_flight(key=lambda id: None)
+        def load(id):
+            executed.append(id)
+            release.wait(5)
+
+        threads = [threading.Thread(target=load, args=(1,))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while len(executed) < 3:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert load.metrics._asdict() == {
+            'calls': 3, 'executions': 3, 'coalesced': 0}
+
+    def test_asyncio(self):
+        executed = []
+
+        @single_flight
+        async def load(id):
+            executed.append(id)
+            await asyncio.sleep(0.01)
+            return [id]
+
+        async def main():
+            return await asyncio.gather(*(load(1) for _ in range(5)),
+                                        load(2))
+
+        results = asyncio.run(main())
+        assert executed == [1, 2]
+        assert results[:5] == [[1]] * 5
+        assert results[0] is results[4]
+        assert load.metrics.coalesced == 4
+        assert asyncio.run(load(1)) == [1]
+        assert load.metrics.executions == 3
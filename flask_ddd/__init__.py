@@ -1,6 +1,8 @@
 import importlib
 import os
 
+from ddd import dispatcher
+
 
 class DDD:
     def __init__(self, app=None):
@@ -8,11 +10,20 @@ class DDD:
             self.init_app(app)
 
     def init_app(self, app):
+        dispatcher.configure(
+            workers=app.config.get('DDD_EVENT_WORKERS', 2),
+            queue_size=app.config.get('DDD_EVENT_QUEUE_SIZE', 1000),
+            retries=app.config.get('DDD_EVENT_RETRIES', 3),
+            sync=app.config.get('DDD_EVENTS_SYNC', False))
         app_path = app.root_path
         app_package = app_path.split('/')[-1]
         contexts = list(
             dir for dir in os.listdir(app_path)
             if os.path.isdir(os.path.join(app_path, dir)))
+        repo_backend = app.config.get('DDD_REPOSITORY_BACKEND')
+        repo_package = '.adapter.repositories'
+        if repo_backend:
+            repo_package += f'.{repo_backend}'
 
         for context in contexts:
             context_package = f'{app_package}.{context}'
@@ -23,7 +34,7 @@ class DDD:
                 continue
             try:
                 repo_module = importlib.import_module(
-                    '.adapter.repositories', package=context_package)
+                    repo_package, package=context_package)
             except ImportError:
                 pass
             else:
@@ -35,6 +46,9 @@ class DDD:
                         repo = repo_cls()
                         registry_name = getattr(repo, '__registry_name__')
                         setattr(registry_repo, registry_name, repo)
+                    init_repos = getattr(repo_module, 'init_app', None)
+                    if init_repos:
+                        init_repos(app)
 
             try:
                 service_module = importlib.import_module(
@@ -48,3 +62,6 @@ class DDD:
                     for service_name in service_names:
                         service = getattr(service_module, service_name)
                         setattr(registry_service, service_name, service)
+                    init_services = getattr(service_module, 'init_app', None)
+                    if init_services:
+                        init_services(app)
@@ -0,0 +1,74 @@
+"""add partial indexes for live articles and soft-delete aware tag counts
+
+Revision ID: 2a7f9e4c6d18
+Revises: 8d4b2a61e0f3
+Create Date: 2026-10-19 11:48:20.407731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a7f9e4c6d18'
+down_revision = '8d4b2a61e0f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # tag.article_count is kept by SQLite triggers only.
+    if op.get_bind().dialect.name != 'sqlite':
+        raise RuntimeError('tag article counts need SQLite triggers')
+    op.create_index('ix_article_live_created_at', 'article',
+                    ['created_at', 'id'],
+                    sqlite_where=sa.text('deleted_at IS NULL'),
+                    postgresql_where=sa.text('deleted_at IS NULL'))
+
+    op.execute('DROP TRIGGER tag_article_count_insert')
+    op.execute('DROP TRIGGER tag_article_count_delete')
+    op.execute(
+        "CREATE TRIGGER tag_article_count_insert "
+        "AFTER INSERT ON tag_article_association "
+        "WHEN (SELECT deleted_at FROM article WHERE id = new.article_id) "
+        "IS NULL BEGIN UPDATE tag SET article_count = article_count + 1 "
+        "WHERE id = new.tag_id; END")
+    op.execute(
+        "CREATE TRIGGER tag_article_count_delete "
+        "AFTER DELETE ON tag_article_association "
+        "WHEN (SELECT deleted_at FROM article WHERE id = old.article_id) "
+        "IS NULL BEGIN UPDATE tag SET article_count = article_count - 1 "
+        "WHERE id = old.tag_id; END")
+    op.execute(
+        "CREATE TRIGGER tag_article_count_soft_delete "
+        "AFTER UPDATE OF deleted_at ON article "
+        "WHEN (old.deleted_at IS NULL) != (new.deleted_at IS NULL) BEGIN "
+        "UPDATE tag SET article_count = article_count + "
+        "(CASE WHEN new.deleted_at IS NULL THEN 1 ELSE -1 END) "
+        "WHERE id IN (SELECT tag_id FROM tag_article_association "
+        "WHERE article_id = new.id); END")
+    op.execute(
+        'UPDATE tag SET article_count = (SELECT COUNT(*) '
+        'FROM tag_article_association JOIN article '
+        'ON article.id = tag_article_association.article_id '
+        'WHERE tag_id = tag.id AND article.deleted_at IS NULL)')
+
+
+def downgrade():
+    op.execute('DROP TRIGGER tag_article_count_soft_delete')
+    op.execute('DROP TRIGGER tag_article_count_delete')
+    op.execute('DROP TRIGGER tag_article_count_insert')
+    op.execute(
+        "CREATE TRIGGER tag_article_count_insert "
+        "AFTER INSERT ON tag_article_association BEGIN "
+        "UPDATE tag SET article_count = article_count + 1 "
+        "WHERE id = new.tag_id; END")
+    op.execute(
+        "CREATE TRIGGER tag_article_count_delete "
+        "AFTER DELETE ON tag_article_association BEGIN "
+        "UPDATE tag SET article_count = article_count - 1 "
+        "WHERE id = old.tag_id; END")
+    op.execute(
+        'UPDATE tag SET article_count = (SELECT COUNT(*) '
+        'FROM tag_article_association WHERE tag_id = tag.id)')
+    op.drop_index('ix_article_live_created_at', 'article')
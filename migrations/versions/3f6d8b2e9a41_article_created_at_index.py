@@ -0,0 +1,23 @@
+"""index every article by creation order for include_deleted listings
+
+Revision ID: 3f6d8b2e9a41
+Revises: 7c3a9f1e5b62
+Create Date: 2026-10-19 19:02:44.118305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6d8b2e9a41'
+down_revision = '7c3a9f1e5b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_article_created_at', 'article', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_article_created_at', 'article')
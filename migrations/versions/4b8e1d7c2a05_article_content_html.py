@@ -0,0 +1,26 @@
+"""store rendered article html keyed by content hash and renderer version
+
+Revision ID: 4b8e1d7c2a05
+Revises: 9e0c7b35f214
+Create Date: 2026-10-19 15:02:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e1d7c2a05'
+down_revision = '9e0c7b35f214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('article', sa.Column('content_html', sa.Text()))
+    op.add_column('article', sa.Column('content_key', sa.String(length=40)))
+
+
+def downgrade():
+    op.drop_column('article', 'content_key')
+    op.drop_column('article', 'content_html')
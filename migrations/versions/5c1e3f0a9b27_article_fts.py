@@ -0,0 +1,45 @@
+"""add article full-text search index
+
+Revision ID: 5c1e3f0a9b27
+Revises: 11b7be87938d
+Create Date: 2026-10-19 10:12:05.113402
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e3f0a9b27'
+down_revision = '11b7be87938d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE VIRTUAL TABLE article_fts USING fts5("
+        "title, content, content='article', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')")
+    op.execute(
+        "CREATE TRIGGER article_fts_insert AFTER INSERT ON article BEGIN "
+        "INSERT INTO article_fts(rowid, title, content) "
+        "VALUES (new.id, new.title, new.content); END")
+    op.execute(
+        "CREATE TRIGGER article_fts_delete AFTER DELETE ON article BEGIN "
+        "INSERT INTO article_fts(article_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); END")
+    op.execute(
+        "CREATE TRIGGER article_fts_update AFTER UPDATE OF title, content "
+        "ON article BEGIN "
+        "INSERT INTO article_fts(article_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); "
+        "INSERT INTO article_fts(rowid, title, content) "
+        "VALUES (new.id, new.title, new.content); END")
+    op.execute("INSERT INTO article_fts(article_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute('DROP TRIGGER article_fts_update')
+    op.execute('DROP TRIGGER article_fts_delete')
+    op.execute('DROP TRIGGER article_fts_insert')
+    op.execute('DROP TABLE article_fts')
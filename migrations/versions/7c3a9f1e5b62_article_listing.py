@@ -0,0 +1,76 @@
+"""add denormalized article_listing read table
+
+Revision ID: 7c3a9f1e5b62
+Revises: 4b8e1d7c2a05
+Create Date: 2026-10-19 17:21:09.530112
+
+"""
+import json
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3a9f1e5b62'
+down_revision = '4b8e1d7c2a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    listing = op.create_table(
+        'article_listing',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=True),
+        sa.Column('author_name', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('tag_names', sa.Text(), server_default='[]',
+                  nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_article_listing_created_at', 'article_listing',
+                    ['created_at', 'id'])
+    _backfill(listing)
+
+
+def _backfill(listing, batch_size=500):
+    """Fills the listing from the live articles, their tag names in tag
+    id order like SqlArticleRepo.rebuild_listing writes them.
+    """
+    article = sa.table('article', sa.column('id'), sa.column('title'),
+                       sa.column('author_name'), sa.column('created_at'),
+                       sa.column('deleted_at'))
+    association = sa.table('tag_article_association',
+                           sa.column('article_id'), sa.column('tag_id'))
+    tag = sa.table('tag', sa.column('id'), sa.column('name'))
+    columns = ['id', 'title', 'author_name', 'created_at']
+    op.execute(listing.insert().from_select(
+        columns, sa.select([article.c[name] for name in columns]).where(
+            article.c.deleted_at.is_(None))))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.select([
+        association.c.article_id, tag.c.name
+    ]).select_from(association.join(
+        tag, association.c.tag_id == tag.c.id)).where(
+            association.c.article_id.in_(sa.select([listing.c.id]))
+    ).order_by(association.c.article_id, tag.c.id)).fetchall()
+    update = listing.update().where(
+        listing.c.id == sa.bindparam('article_id')).values(
+            tag_names=sa.bindparam('names'))
+    batch = []
+    for article_id, tags in groupby(rows, key=lambda row: row[0]):
+        batch.append({'article_id': article_id,
+                      'names': json.dumps([name for _, name in tags])})
+        if len(batch) == batch_size:
+            bind.execute(update, batch)
+            batch = []
+    if batch:
+        bind.execute(update, batch)
+
+
+def downgrade():
+    op.drop_index('ix_article_listing_created_at', 'article_listing')
+    op.drop_table('article_listing')
@@ -0,0 +1,74 @@
+"""add tag_article_association keys and tag article counts
+
+Revision ID: 8d4b2a61e0f3
+Revises: 5c1e3f0a9b27
+Create Date: 2026-10-19 11:03:47.520118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4b2a61e0f3'
+down_revision = '5c1e3f0a9b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # tag.article_count is kept by SQLite triggers only.
+    if op.get_bind().dialect.name != 'sqlite':
+        raise RuntimeError('tag article counts need SQLite triggers')
+    op.create_table('tag_article_association_new',
+    sa.Column('tag_id', sa.BigInteger(), nullable=False),
+    sa.Column('article_id', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['article.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ),
+    sa.PrimaryKeyConstraint('tag_id', 'article_id')
+    )
+    op.execute(
+        'INSERT INTO tag_article_association_new (tag_id, article_id) '
+        'SELECT DISTINCT tag_id, article_id FROM tag_article_association '
+        'WHERE tag_id IS NOT NULL AND article_id IS NOT NULL')
+    op.drop_table('tag_article_association')
+    op.rename_table('tag_article_association_new', 'tag_article_association')
+    op.create_index('ix_tag_article_association_article_id_tag_id',
+                    'tag_article_association', ['article_id', 'tag_id'])
+
+    op.add_column('tag', sa.Column('article_count', sa.Integer(),
+                                   nullable=False, server_default='0'))
+    op.execute(
+        'UPDATE tag SET article_count = (SELECT COUNT(*) '
+        'FROM tag_article_association WHERE tag_id = tag.id)')
+    op.execute(
+        "CREATE TRIGGER tag_article_count_insert "
+        "AFTER INSERT ON tag_article_association BEGIN "
+        "UPDATE tag SET article_count = article_count + 1 "
+        "WHERE id = new.tag_id; END")
+    op.execute(
+        "CREATE TRIGGER tag_article_count_delete "
+        "AFTER DELETE ON tag_article_association BEGIN "
+        "UPDATE tag SET article_count = article_count - 1 "
+        "WHERE id = old.tag_id; END")
+
+
+def downgrade():
+    op.execute('DROP TRIGGER tag_article_count_delete')
+    op.execute('DROP TRIGGER tag_article_count_insert')
+    with op.batch_alter_table('tag') as batch_op:
+        batch_op.drop_column('article_count')
+
+    op.drop_index('ix_tag_article_association_article_id_tag_id',
+                  'tag_article_association')
+    op.create_table('tag_article_association_old',
+    sa.Column('tag_id', sa.BigInteger(), nullable=True),
+    sa.Column('article_id', sa.BigInteger(), nullable=True),
+    sa.ForeignKeyConstraint(['article_id'], ['article.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], )
+    )
+    op.execute(
+        'INSERT INTO tag_article_association_old (tag_id, article_id) '
+        'SELECT tag_id, article_id FROM tag_article_association')
+    op.drop_table('tag_article_association')
+    op.rename_table('tag_article_association_old', 'tag_article_association')
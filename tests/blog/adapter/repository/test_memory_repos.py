@@ -0,0 +1,210 @@
+from typing import List
+
+import pytest
+
+from app.blog.adapter.repositories.memory import init_app
+from app.blog.adapter.repositories.memory.repos import MemoryTagRepo, \
+    MemoryArticleRepo, store
+from app.blog.adapter.repositories.sql.repos import SqlArticleRepo
+from app.blog.domain.models import ArticleCursor, ArticleSummary, \
+    SearchResult, Tag, TagId
+from app.blog.domain.registries import repos
+from tests.common.helpers import MemoryEnvironment, SqlEnvironment
+
+
+class TestMemoryTagRepo(MemoryEnvironment):
+    @pytest.fixture(scope='class')
+    def repo(self):
+        return MemoryTagRepo()
+
+    def test_registered(self, repo):
+        assert isinstance(repos.tag, MemoryTagRepo)
+
+    def test_save_one_tag_twice(self, repo, mock_tag):
+        repo.save(mock_tag)
+        mock_tag.name = 'love'
+        saved_tags = repo.all()
+        assert len(saved_tags) == 1
+        assert saved_tags[0].name == 'life'
+
+        repo.save(mock_tag)
+        assert repo.all()[0].name == 'love'
+
+    def test_all(self, repo, mock_tag, another_mock_tag):
+        repo.save(mock_tag)
+        repo.save(another_mock_tag)
+        saved_tags = repo.all()
+        assert isinstance(saved_tags, List)
+        assert saved_tags == [mock_tag, another_mock_tag]
+
+    def test_all_with_counts(self, repo, mock_tag, another_mock_tag,
+                             mock_article, another_mock_article):
+        repo.save(another_mock_tag)
+        assert repo.all_with_counts() == [(another_mock_tag, 0)]
+
+        article_repo = MemoryArticleRepo()
+        article_repo.save(mock_article)
+        article_repo.save(another_mock_article)
+        assert dict(repo.all_with_counts()) == {
+            mock_tag: 2, another_mock_tag: 1}
+
+        another_mock_article.tags = []
+        article_repo.save(another_mock_article)
+        assert dict(repo.all_with_counts()) == {
+            mock_tag: 1, another_mock_tag: 1}
+
+
+class TestMemoryArticleRepo(MemoryEnvironment):
+    @pytest.fixture(scope='class')
+    def repo(self):
+        return MemoryArticleRepo()
+
+    def test_save_one_article(self, repo, mock_article):
+        repo.save(mock_article)
+        saved_article, = repo.recent_articles_of_page()
+        assert saved_article is not mock_article
+        assert tuple(saved_article) == tuple(mock_article)
+
+    def test_save_one_article_twice(self, repo, mock_article):
+        repo.save(mock_article)
+        mock_article.title = 'New Title'
+        repo.save(mock_article)
+        saved_articles = repo.recent_articles_of_page()
+        assert len(saved_articles) == 1
+        assert saved_articles[0].title == 'New Title'
+
+    def test_recent_articles_of_page(
+            self, repo, mock_article, another_mock_article):
+        repo.save(another_mock_article)
+        repo.save(mock_article)
+        assert repo.recent_articles_of_page(page=0, page_count=1) == [
+            mock_article]
+        assert repo.recent_articles_of_page(page=1, page_count=1) == [
+            another_mock_article]
+
+    def test_article(self, repo, mock_article):
+        repo.save(mock_article)
+        assert repo.article(mock_article.id.value) == mock_article
+        assert repo.article(0) is None
+
+    def test_articles_by_tag(self, repo, mock_tag, another_mock_tag,
+                             mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        assert repo.articles_by_tag(another_mock_tag.id.value) == [
+            mock_article]
+
+        first, = repo.articles_by_tag(mock_tag.id.value, limit=1)
+        assert first == mock_article
+        assert repo.articles_by_tag(
+            mock_tag.id.value, cursor=ArticleCursor.of(first)) == [
+            another_mock_article]
+
+    def test_recent_articles(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        first, = repo.recent_articles(limit=1)
+        assert first == mock_article
+        assert repo.recent_articles(cursor=ArticleCursor.of(first)) == [
+            another_mock_article]
+
+    def test_latest_versions(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        assert repo.latest_versions(limit=1) == [
+            (2, another_mock_article.created_at)]
+        assert [id for id, _ in repo.latest_versions()] == [2, 1]
+        assert repo.articles_of([2]) == [another_mock_article]
+        assert repo.articles_of([]) == []
+
+    def test_version_ranges(self, repo, mock_article, another_mock_article):
+        assert repo.first_live_id() is None
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        version = mock_article.created_at
+        assert repo.version_range(1) == (1, 2, 2, version)
+        assert list(repo.iter_versions(1, 2, batch_size=1)) == [
+            [(1, version)], [(2, version)]]
+        assert list(repo.iter_versions(2, 5)) == [[(2, version)]]
+
+        repo.delete(mock_article)
+        assert repo.first_live_id() == 2
+        assert repo.first_live_id(2) == 2
+        assert repo.first_live_id(3) is None
+        assert repo.version_range(1, 2) is None
+        assert repo.version_range(1) == (2, 2, 1, version)
+
+    def test_save_many_and_iter(self, repo, mock_article,
+                                another_mock_article):
+        repo.save_many([mock_article, another_mock_article])
+        repo.delete(another_mock_article)
+        batches = list(repo.iter_articles(batch_size=1))
+        assert batches == [[mock_article], [another_mock_article]]
+        assert batches[0][0].tags == mock_article.tags
+        assert batches[1][0].deleted_at is not None
+
+    def test_listing_page(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        summary = repo.listing_page(page_count=1)[0]
+        assert summary == ArticleSummary(
+            mock_article.id, 'A Title', 'psyche', mock_article.created_at,
+            ['life', 'coding'])
+        assert len(repo.listing_page(page=1, page_count=1)) == 1
+
+        MemoryTagRepo().save(Tag(TagId(2), 'python'))
+        assert repo.listing_page()[0].tag_names == ['life', 'python']
+        assert [tag.name for tag in repo.article(1).tags] == [
+            'life', 'python']
+        assert [tag.name for tag in repo.articles_of([2])[0].tags] == [
+            'life']
+
+        repo.delete(mock_article)
+        assert [summary.title for summary in repo.listing_page()] == [
+            'Another Title']
+
+    def test_delete(self, repo, mock_tag, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        repo.delete(mock_article)
+
+        assert repo.recent_articles_of_page() == [another_mock_article]
+        assert repo.recent_articles_of_page(include_deleted=True) == [
+            mock_article, another_mock_article]
+        assert repo.article(mock_article.id.value) is None
+        deleted = repo.article(mock_article.id.value, include_deleted=True)
+        assert deleted.deleted_at is not None
+        assert repo.articles_by_tag(mock_tag.id.value) == [
+            another_mock_article]
+        assert repo.search('A Title') == []
+        assert dict(MemoryTagRepo().all_with_counts())[mock_tag] == 1
+
+        mock_article.deleted_at = None
+        repo.save(mock_article)
+        assert dict(MemoryTagRepo().all_with_counts())[mock_tag] == 2
+
+    def test_search(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        result, = repo.search('other')
+        assert result.article_id == another_mock_article.id
+        assert SearchResult.HIGHLIGHT_START + 'other' in result.snippet
+        assert len(repo.search('title')) == 2
+        assert repo.search('') == []
+
+
+class TestSnapshot(SqlEnvironment):
+    @pytest.fixture(autouse=True)
+    def store(self):
+        yield store
+        store.clear()
+
+    def test_load_snapshot_from_sql(self, app, mock_article, monkeypatch):
+        SqlArticleRepo().save(mock_article)
+        monkeypatch.setitem(app.config, 'MEMORY_REPOSITORY_SNAPSHOT', True)
+        init_app(app)
+
+        saved_article = MemoryArticleRepo().article(mock_article.id.value)
+        assert tuple(saved_article) == tuple(mock_article)
+        assert dict(MemoryTagRepo().all_with_counts()) == {
+            tag: 1 for tag in mock_article.tags}
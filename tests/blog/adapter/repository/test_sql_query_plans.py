@@ -0,0 +1,134 @@
+import os
+import re
+import sqlite3
+import warnings
+from datetime import datetime
+
+import pytest
+
+from app.blog.adapter.repositories.sql.repos import SqlTagRepo, SqlArticleRepo
+from app.blog.domain.models import Article, ArticleCursor, ArticleId, \
+    Author, Tag, TagId
+from tests.common.helpers import SqlEnvironment, query_plans
+
+SNAPSHOTS = os.path.join(os.path.dirname(__file__), 'query_plans')
+
+# Tables that grow with the content. A SCAN of one, through an index or
+# not, walks the whole table unless a LIMIT without OFFSET stops it.
+_scan = re.compile(
+    r'^\s*SCAN (article|article_listing|tag_article_association)(_\d+)?\b')
+
+# Intentional walks that grow with the content, and why they are fine.
+_walks = {
+    'recent_articles_of_page':
+        'page-number listing; OFFSET walks page * page_count index rows',
+    'recent_articles_of_page_include_deleted':
+        'page-number listing; OFFSET walks page * page_count index rows',
+    'listing_page':
+        'page-number index pages; OFFSET walks the listing index',
+    'versions_of_page':
+        'page-number index pages; OFFSET walks the live index',
+}
+
+_cursor = ArticleCursor(datetime(year=2018, month=7, day=1), 0)
+_tag = Tag(TagId(1), 'life')
+_article = Article(ArticleId(1), 'A Title', 'content', Author(1, 'psyche'),
+                   datetime(year=2018, month=7, day=15), None, None,
+                   tags=[_tag])
+
+calls = {
+    'tag_save_many': lambda tags, articles: tags.save_many([_tag]),
+    'tag_all': lambda tags, articles: tags.all(),
+    'tag_all_with_counts': lambda tags, articles: tags.all_with_counts(),
+    'article_save_many':
+        lambda tags, articles: articles.save_many([_article]),
+    'iter_articles': lambda tags, articles: list(articles.iter_articles(2)),
+    'recent_articles_of_page':
+        lambda tags, articles: articles.recent_articles_of_page(1, 1),
+    'recent_articles_of_page_include_deleted':
+        lambda tags, articles: articles.recent_articles_of_page(
+            1, 1, include_deleted=True),
+    'recent_articles': lambda tags, articles: articles.recent_articles(
+        _cursor, 2, ('id', 'title', 'tags')),
+    'listing_page': lambda tags, articles: articles.listing_page(1, 1),
+    'rebuild_listing': lambda tags, articles: articles.rebuild_listing(),
+    'article': lambda tags, articles: articles.article(1),
+    'version_of_article':
+        lambda tags, articles: articles.version_of_article(1),
+    'versions_of_page': lambda tags, articles: articles.versions_of_page(1, 1),
+    'latest_versions': lambda tags, articles: articles.latest_versions(2),
+    'articles_of': lambda tags, articles: articles.articles_of([1, 2]),
+    'first_live_id': lambda tags, articles: articles.first_live_id(2),
+    'version_range': lambda tags, articles: articles.version_range(1, 3),
+    'iter_versions':
+        lambda tags, articles: list(articles.iter_versions(1, 3, 2)),
+    'articles_by_tag':
+        lambda tags, articles: articles.articles_by_tag(1, _cursor, 2),
+    'search': lambda tags, articles: articles.search('title'),
+}
+
+
+class TestQueryPlans(SqlEnvironment):
+    """Snapshots the plan of every query the SQL repos issue. Rerun with
+    UPDATE_QUERY_PLANS=1 to rewrite the snapshots, then review the diff.
+    """
+
+    @pytest.fixture(autouse=True)
+    def seed(self, table, mock_tag, another_mock_tag, mock_article,
+             another_mock_article):
+        SqlTagRepo().save_many([mock_tag, another_mock_tag])
+        deleted = Article(ArticleId(3), 'Deleted Title', 'content',
+                          mock_article.author, mock_article.created_at,
+                          None, datetime(year=2018, month=8, day=1),
+                          tags=[mock_tag])
+        SqlArticleRepo().save_many(
+            [mock_article, another_mock_article, deleted])
+
+    @pytest.mark.parametrize('name', calls)
+    def test_plan(self, name):
+        with query_plans() as plans:
+            calls[name](SqlTagRepo(), SqlArticleRepo())
+        assert plans
+        walks = [line.strip() for statement, plan, parameters in plans
+                 if not _bounded(statement, plan, parameters)
+                 for line in plan if _scan.match(line)]
+        if name in _walks:
+            assert walks, f'{name} no longer walks, drop it from _walks'
+        else:
+            assert not walks, f'{name} walks the table: {walks}'
+        _match_snapshot(name, _render(plans))
+
+
+def _bounded(statement, plan, parameters):
+    """Whether a LIMIT stops the scan: rows come in index order, with no
+    sort in between, and no OFFSET makes it walk past rows first.
+    """
+    if not statement.endswith('LIMIT ? OFFSET ?') or \
+            any('TEMP B-TREE' in line for line in plan):
+        return False
+    return all(values[-1] == 0 for values in parameters)
+
+
+def _render(plans):
+    return ''.join(
+        f'\n{statement}\n' + ''.join(f'  {line}\n' for line in plan)
+        for statement, plan, _ in plans)
+
+
+def _match_snapshot(name, rendered):
+    path = os.path.join(SNAPSHOTS, f'{name}.txt')
+    header = f'-- SQLite {sqlite3.sqlite_version}\n'
+    if os.environ.get('UPDATE_QUERY_PLANS'):
+        os.makedirs(SNAPSHOTS, exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(header + rendered)
+        return
+    with open(path) as file:
+        recorded_header = file.readline()
+        recorded = file.read()
+    if recorded_header != header:
+        warnings.warn(f'{name}: plans were recorded with '
+                      f'{recorded_header[3:].strip()}, not compared on '
+                      f'SQLite {sqlite3.sqlite_version}')
+        return
+    assert rendered == recorded
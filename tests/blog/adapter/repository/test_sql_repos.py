@@ -1,8 +1,16 @@
+from datetime import datetime, timedelta, timezone
 from typing import List
 
 import pytest
+from flask import Flask
 
+from app.blog.adapter.repositories.sql import init_app
 from app.blog.adapter.repositories.sql.repos import SqlTagRepo, SqlArticleRepo
+from app.blog.adapter.services import content_renderer
+from app.blog.adapter.repositories.sql.tables import article_listing
+from app.blog.domain.models import ArticleCursor, ArticleSummary, \
+    SearchResult, Tag, TagId
+from app.common.adapter.repositories.sql import db
 from tests.common.helpers import SqlEnvironment
 
 
@@ -43,6 +51,22 @@ class TestUserRepo(SqlEnvironment):
         saved_tags = repo.all()
         assert len(saved_tags) == 2
 
+    def test_all_with_counts(self, repo, mock_tag, another_mock_tag,
+                             mock_article, another_mock_article):
+        repo.save(another_mock_tag)
+        assert repo.all_with_counts() == [(another_mock_tag, 0)]
+
+        article_repo = SqlArticleRepo()
+        article_repo.save(mock_article)
+        article_repo.save(another_mock_article)
+        assert dict(repo.all_with_counts()) == {
+            mock_tag: 2, another_mock_tag: 1}
+
+        another_mock_article.tags = []
+        article_repo.save(another_mock_article)
+        assert dict(repo.all_with_counts()) == {
+            mock_tag: 1, another_mock_tag: 1}
+
 
 class TestArticleRepo(SqlEnvironment):
     @pytest.fixture(scope='class')
@@ -90,3 +114,158 @@ class TestArticleRepo(SqlEnvironment):
         saved_articles = repo.recent_articles_of_page(page=1, page_count=1)
         assert len(saved_articles) == 1
         assert saved_articles[0].id == another_mock_article.id
+
+    def test_articles_by_tag(self, repo, mock_tag, another_mock_tag,
+                             mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        assert repo.articles_by_tag(another_mock_tag.id.value) == [
+            mock_article]
+        assert repo.articles_by_tag(mock_tag.id.value) == [
+            mock_article, another_mock_article]
+
+        first, = repo.articles_by_tag(mock_tag.id.value, limit=1)
+        assert first == mock_article
+        assert repo.articles_by_tag(
+            mock_tag.id.value, cursor=ArticleCursor.of(first)) == [
+            another_mock_article]
+
+    def test_recent_articles(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        first, = repo.recent_articles(limit=1, fields=('id', 'title'))
+        assert first == mock_article
+        assert 'content' not in vars(first)
+        assert repo.recent_articles(cursor=ArticleCursor.of(first)) == [
+            another_mock_article]
+
+    def test_latest_versions(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        assert repo.latest_versions(limit=1) == [
+            (2, another_mock_article.created_at)]
+        assert [id for id, _ in repo.latest_versions()] == [2, 1]
+        assert repo.articles_of([2]) == [another_mock_article]
+        assert repo.articles_of([]) == []
+
+    def test_version_ranges(self, repo, mock_article, another_mock_article):
+        assert repo.first_live_id() is None
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        version = mock_article.created_at
+        assert repo.version_range(1) == (1, 2, 2, version)
+        assert list(repo.iter_versions(1, 2, batch_size=1)) == [
+            [(1, version)], [(2, version)]]
+        assert list(repo.iter_versions(2, 5)) == [[(2, version)]]
+
+        repo.delete(mock_article)
+        assert repo.first_live_id() == 2
+        assert repo.first_live_id(2) == 2
+        assert repo.first_live_id(3) is None
+        assert repo.version_range(1, 2) is None
+        assert repo.version_range(1) == (2, 2, 1, version)
+
+    def test_save_many_and_iter(self, repo, mock_article,
+                                another_mock_article):
+        repo.save_many([mock_article, another_mock_article])
+        repo.delete(another_mock_article)
+        batches = list(repo.iter_articles(batch_size=1))
+        assert batches == [[mock_article], [another_mock_article]]
+        assert batches[0][0].tags == mock_article.tags
+        assert batches[1][0].deleted_at is not None
+
+    def test_listing_page(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        summary = repo.listing_page(page_count=1)[0]
+        assert summary == ArticleSummary(
+            mock_article.id, 'A Title', 'psyche', mock_article.created_at,
+            ['life', 'coding'])
+        assert len(repo.listing_page(page=1, page_count=1)) == 1
+
+        SqlTagRepo().save(Tag(TagId(2), 'python'))
+        assert repo.listing_page()[0].tag_names == ['life', 'python']
+
+        db.session.execute(article_listing.delete())
+        db.session.commit()
+        assert repo.listing_page() == []
+        repo.rebuild_listing()
+        assert [summary.id.value for summary in repo.listing_page()] == [1, 2]
+
+        repo.delete(mock_article)
+        assert [summary.title for summary in repo.listing_page()] == [
+            'Another Title']
+
+    def test_delete(self, repo, mock_tag, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        repo.delete(mock_article)
+
+        assert repo.recent_articles_of_page() == [another_mock_article]
+        assert repo.recent_articles_of_page(include_deleted=True) == [
+            mock_article, another_mock_article]
+        assert repo.article(mock_article.id.value) is None
+        deleted = repo.article(mock_article.id.value, include_deleted=True)
+        assert abs(deleted.deleted_at - datetime.now(timezone.utc).replace(
+            tzinfo=None)) < timedelta(minutes=1)
+        assert repo.articles_by_tag(mock_tag.id.value) == [
+            another_mock_article]
+        assert repo.search('A Title') == []
+        assert dict(SqlTagRepo().all_with_counts())[mock_tag] == 1
+
+        mock_article.deleted_at = None
+        repo.save(mock_article)
+        assert dict(SqlTagRepo().all_with_counts())[mock_tag] == 2
+
+    def test_search(self, repo, mock_article, another_mock_article):
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        results = repo.search('other')
+        assert len(results) == 1
+        assert results[0].article_id == another_mock_article.id
+        assert results[0].title == another_mock_article.title
+        assert SearchResult.HIGHLIGHT_START + 'other' in results[0].snippet
+
+        results = repo.search('title')
+        assert [r.article_id for r in results] == [
+            mock_article.id, another_mock_article.id]
+        assert repo.search('title', limit=1, cursor=1)[0].article_id == \
+            another_mock_article.id
+
+    def test_search_follows_updates(self, repo, mock_article):
+        repo.save(mock_article)
+        mock_article.content = 'rewritten'
+        repo.save(mock_article)
+        assert repo.search('content') == []
+        assert len(repo.search('rewritten')) == 1
+
+    def test_search_escapes_query_syntax(self, repo, mock_article):
+        repo.save(mock_article)
+        assert repo.search('"A" OR') == []
+        assert repo.search('') == []
+
+    def test_rebuild_search_index(self, repo, mock_article):
+        repo.save(mock_article)
+        repo.rebuild_search_index()
+        assert len(repo.search('content')) == 1
+
+    def test_render_on_save(self, repo, mock_article, monkeypatch):
+        repo.save(mock_article)
+        saved_article = repo.article(1)
+        assert saved_article.content_html == "<p>article's content</p>"
+        assert saved_article.content_key == \
+            content_renderer.key(mock_article.content)
+
+        monkeypatch.setattr(type(content_renderer), '__call__', None)
+        saved_article.title = 'New Title'
+        repo.save(saved_article)
+        saved_article = repo.article(1)
+        assert saved_article.title == 'New Title'
+        assert saved_article.content_html == "<p>article's content</p>"
+
+
+def test_requires_sqlite():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://localhost/blog'
+    with pytest.raises(RuntimeError):
+        init_app(app)
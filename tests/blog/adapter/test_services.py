@@ -0,0 +1,27 @@
+from app.blog.adapter.services import content_renderer
+
+
+class TestMarkdownRenderer:
+    def test_render(self):
+        assert content_renderer('# Title\n\n*text*') == \
+            '<h1>Title</h1>\n<p><em>text</em></p>'
+
+    def test_escape_raw_html(self):
+        assert content_renderer('<script>alert(1)</script>') == \
+            '<p>&lt;script&gt;alert(1)&lt;/script&gt;</p>'
+        assert '<b>' not in content_renderer('a <b>bold</b> word')
+
+    def test_drop_unsafe_urls(self):
+        html = content_renderer(
+            '[a](javascript:alert(1)) [b](jav&#x61;script:x) '
+            '![c](data:image/png,x) [d](https://example.com)')
+        assert 'script:' not in html
+        assert 'data:' not in html
+        assert 'href="https://example.com"' in html
+
+    def test_key(self, monkeypatch):
+        key = content_renderer.key('content')
+        assert key == content_renderer.key('content')
+        assert key != content_renderer.key('other content')
+        monkeypatch.setattr(type(content_renderer), 'version', 2)
+        assert key != content_renderer.key('content')
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.blog.adapter.repositories.sql.repos import SqlArticleRepo
+from app.blog.domain.models import ArticleCursor
+from app.blog.presentation.api import _encode_cursor
+from tests.common.helpers import SqlEnvironment, max_queries
+
+
+class TestApi(SqlEnvironment):
+    @pytest.fixture
+    def client(self, app, mock_article, another_mock_article):
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        return app.test_client()
+
+    def test_articles(self, client):
+        response = client.get('/api/articles')
+        assert 'Content-Length' not in response.headers
+        assert response.cache_control.max_age == 60
+        assert response.json == {'articles': [{
+            'id': 1, 'title': 'A Title', 'author': 'psyche',
+            'created_at': '2018-07-15T00:00:00', 'updated_at': None,
+        }, {
+            'id': 2, 'title': 'Another Title', 'author': 'psyche',
+            'created_at': '2018-07-15T00:00:00', 'updated_at': None,
+        }], 'next': None}
+
+    def test_articles_cursor(self, client):
+        first = client.get('/api/articles?limit=1&fields=id').json
+        assert first['articles'] == [{'id': 1}]
+        second = client.get(
+            f'/api/articles?limit=1&fields=id&cursor={first["next"]}').json
+        assert second['articles'] == [{'id': 2}]
+        last = client.get(
+            f'/api/articles?limit=1&fields=id&cursor={second["next"]}').json
+        assert last == {'articles': [], 'next': None}
+
+    def test_aware_cursor(self, client):
+        cursor = _encode_cursor(ArticleCursor(datetime(
+            2018, 7, 15, 2, tzinfo=timezone(timedelta(hours=2))), 1))
+        response = client.get(f'/api/articles?fields=id&cursor={cursor}')
+        assert response.json['articles'] == [{'id': 2}]
+
+    def test_articles_fields(self, client):
+        with max_queries(1) as stats:
+            response = client.get('/api/articles?fields=id,title')
+            assert response.json['articles'][0] == {
+                'id': 1, 'title': 'A Title'}
+        statement, = [statement for statement, _, _ in stats.statements]
+        assert 'article.content' not in statement
+
+        with max_queries(2):
+            response = client.get('/api/articles?fields=id,tags')
+            assert response.json['articles'][0] == {
+                'id': 1, 'tags': ['life', 'coding']}
+
+    def test_bad_requests(self, client):
+        response = client.get('/api/articles?cursor=bm9wZQ')
+        assert response.status_code == 400
+        assert response.json == {'error': 'invalid cursor'}
+        response = client.get('/api/articles?fields=id,password')
+        assert response.status_code == 400
+        assert response.json == {'error': 'unknown fields: password'}
+
+    def test_article(self, client):
+        response = client.get('/api/articles/1')
+        assert response.json['content_html'] == "<p>article's content</p>"
+        assert response.json['tags'] == ['life', 'coding']
+        etag = response.headers['ETag']
+        assert client.get('/api/articles/1', headers={
+            'If-None-Match': etag}).status_code == 304
+        assert client.get('/api/articles/1?fields=id').headers['ETag'] \
+            != etag
+
+    def test_missing_article(self, client):
+        response = client.get('/api/articles/3')
+        assert response.status_code == 404
+        assert response.json == {'error': 'article not found'}
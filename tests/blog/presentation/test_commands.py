@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app.blog.adapter.repositories.sql.repos import SqlArticleRepo, \
+    SqlTagRepo
+from app.blog.adapter.services import content_renderer
+from app.blog.domain.models import Tag, TagId
+from app.blog.presentation import jsonl
+from app.common.adapter.repositories.sql import db
+from tests.common.helpers import SqlEnvironment
+
+
+class TestRenderContent(SqlEnvironment):
+    def test_render_content(self, app, monkeypatch, mock_article,
+                            another_mock_article):
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        runner = app.test_cli_runner()
+        args = ['blog', 'render-content', '--workers', '2']
+        assert runner.invoke(args=args).output == '0 articles rendered.\n'
+
+        monkeypatch.setattr(type(content_renderer), 'version', 2)
+        assert runner.invoke(args=args).output == '2 articles rendered.\n'
+        assert repo.article(1).content_key == \
+            content_renderer.key(mock_article.content)
+
+
+class TestJsonl(SqlEnvironment):
+    @pytest.fixture
+    def dump(self, app, tmp_path, mock_article, another_mock_article):
+        SqlTagRepo().save(Tag(TagId(3), 'unused'))
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        repo.delete(another_mock_article)
+        path = tmp_path / 'dump.jsonl'
+        result = app.test_cli_runner().invoke(
+            args=['blog', 'export-jsonl', str(path)])
+        assert result.stderr == '5 records exported.\n'
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        return path
+
+    def test_round_trip(self, app, dump, mock_article, another_mock_article):
+        with open(dump) as file:
+            assert [json.loads(line)['type'] for line in file] == \
+                ['tag'] * 3 + ['article'] * 2
+        result = app.test_cli_runner().invoke(
+            args=['blog', 'import-jsonl', str(dump), '--batch-size', '2'])
+        assert result.output == '5 records imported.\n'
+
+        repo = SqlArticleRepo()
+        assert repo.recent_articles_of_page() == [mock_article]
+        deleted = repo.article(2, include_deleted=True)
+        assert deleted.deleted_at is not None
+        assert deleted.tags == another_mock_article.tags
+        assert repo.article(1).content_html == "<p>article's content</p>"
+        assert sorted(tag.name for tag in SqlTagRepo().all()) == \
+            ['coding', 'life', 'unused']
+
+    def test_resume(self, dump, monkeypatch):
+        save_articles = jsonl.save_articles
+
+        def fail(articles):
+            raise RuntimeError('connection lost')
+
+        monkeypatch.setattr(jsonl, 'save_articles', fail)
+        with pytest.raises(RuntimeError):
+            jsonl.import_jsonl(str(dump), batch_size=3)
+        with open(f'{dump}.checkpoint') as file:
+            offset = json.load(file)['offset']
+        with open(dump, 'rb') as file:
+            assert offset == len(b''.join(file.readlines()[:3]))
+
+        monkeypatch.setattr(jsonl, 'save_articles', save_articles)
+        assert jsonl.import_jsonl(str(dump), batch_size=3) == 2
+        assert len(SqlArticleRepo().recent_articles_of_page(
+            include_deleted=True)) == 2
+        assert not (dump.parent / 'dump.jsonl.checkpoint').exists()
+
+
+class TestRebuildListing(SqlEnvironment):
+    def test_rebuild_listing(self, app, mock_article):
+        SqlArticleRepo().save(mock_article)
+        db.session.execute('DELETE FROM article_listing')
+        db.session.commit()
+        result = app.test_cli_runner().invoke(
+            args=['blog', 'rebuild-listing'])
+        assert result.output == 'Article listing rebuilt.\n'
+        assert b'A Title' in app.test_client().get('/').data
@@ -0,0 +1,54 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from app.blog.adapter.repositories.sql.repos import SqlArticleRepo
+from app.blog.presentation.export import MANIFEST
+from tests.common.helpers import SqlEnvironment
+
+
+class TestExport(SqlEnvironment):
+    @pytest.fixture
+    def export(self, app, tmp_path, mock_article, another_mock_article):
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        runner = app.test_cli_runner()
+
+        def export():
+            result = runner.invoke(args=['blog', 'export', str(tmp_path)])
+            assert result.exit_code == 0, result.output
+            return result.output
+
+        return export
+
+    def test_export(self, export, tmp_path):
+        assert export() == '3 pages rendered, 0 removed.\n'
+        with open(tmp_path / 'index.html') as file:
+            assert 'A Title' in file.read()
+        with open(tmp_path / 'article' / '2' / 'index.html') as file:
+            assert 'Another Title' in file.read()
+        with open(tmp_path / MANIFEST) as file:
+            assert set(json.load(file)) == \
+                {'/', '/article/1/', '/article/2/'}
+
+    def test_incremental(self, export, tmp_path, mock_article,
+                         another_mock_article):
+        export()
+        untouched = os.stat(tmp_path / 'article' / '2' / 'index.html')
+        assert export() == '0 pages rendered, 0 removed.\n'
+
+        mock_article.title = 'New Title'
+        mock_article.updated_at = datetime(year=2018, month=8, day=1)
+        SqlArticleRepo().save(mock_article)
+        assert export() == '2 pages rendered, 0 removed.\n'
+        with open(tmp_path / 'article' / '1' / 'index.html') as file:
+            assert 'New Title' in file.read()
+        assert os.stat(tmp_path / 'article' / '2' / 'index.html') \
+            .st_mtime_ns == untouched.st_mtime_ns
+
+        SqlArticleRepo().delete(another_mock_article)
+        assert export() == '1 pages rendered, 1 removed.\n'
+        assert not os.path.exists(tmp_path / 'article' / '2' / 'index.html')
@@ -0,0 +1,382 @@
+import gzip
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+
+import pytest
+
+from app.blog import usecase
+from app.blog.adapter.repositories.sql.repos import SqlArticleRepo
+from app.blog.adapter.services import content_renderer
+from app.blog.domain.models import Article, ArticleId
+from app.blog.presentation import views
+from app.blog.presentation import cache
+from app.blog.presentation.views import sitemap_shards
+from app.blog.presentation.cache import page_cache
+from tests.common.helpers import SqlEnvironment, max_queries
+
+
+class TestConditionalGet(SqlEnvironment):
+    @pytest.fixture
+    def client(self, app, mock_article, another_mock_article):
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        return app.test_client()
+
+    def test_article_validators(self, client, mock_article):
+        response = client.get('/article/1/')
+        assert response.status_code == 200
+        assert response.headers['ETag']
+        assert response.last_modified == mock_article.created_at.replace(
+            tzinfo=response.last_modified.tzinfo)
+
+    def test_article_if_none_match(self, client):
+        etag = client.get('/article/1/').headers['ETag']
+        with max_queries(1):
+            response = client.get('/article/1/',
+                                  headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    def test_article_if_modified_since(self, client):
+        last_modified = client.get('/article/1/').headers['Last-Modified']
+        response = client.get('/article/1/',
+                              headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+
+        response = client.get('/article/1/', headers={
+            'If-Modified-Since': 'Sat, 14 Jul 2018 00:00:00 GMT'})
+        assert response.status_code == 200
+
+    def test_article_updated(self, client, mock_article):
+        etag = client.get('/article/1/').headers['ETag']
+        mock_article.updated_at = datetime(year=2018, month=8, day=1)
+        SqlArticleRepo().save(mock_article)
+        response = client.get('/article/1/', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_missing_article(self, client):
+        assert client.get('/article/3/').status_code == 404
+
+    def test_index_if_none_match(self, client, mock_article):
+        response = client.get('/')
+        assert b'A Title' in response.data
+        etag = response.headers['ETag']
+        with max_queries(1):
+            response = client.get('/', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+        SqlArticleRepo().delete(mock_article)
+        response = client.get('/', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert b'A Title' not in response.data
+
+    def test_index_without_last_modified(self, client, another_mock_article):
+        response = client.get('/')
+        assert 'Last-Modified' not in response.headers
+        SqlArticleRepo().delete(another_mock_article)
+        response = client.get('/', headers={
+            'If-Modified-Since': 'Sat, 14 Jul 2030 00:00:00 GMT'})
+        assert response.status_code == 200
+
+    def test_index_pages(self, client):
+        assert client.get('/page/1/').headers['ETag'] != \
+            client.get('/').headers['ETag']
+
+
+class TestPageCache(SqlEnvironment):
+    @pytest.fixture
+    def client(self, app, mock_article, another_mock_article):
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        yield app.test_client()
+        page_cache.init_app(app)
+
+    def test_hit(self, client):
+        body = client.get('/article/1/').data
+        with max_queries(1):
+            assert client.get('/article/1/').data == body
+
+    def test_article_saved(self, client, mock_article, another_mock_article):
+        client.get('/article/1/')
+        client.get('/')
+        mock_article.title = 'New Title'
+        SqlArticleRepo().save(mock_article)
+        assert b'New Title' in client.get('/article/1/').data
+        assert b'New Title' in client.get('/').data
+
+        another_mock_article.title = 'Other Title'
+        SqlArticleRepo().save(another_mock_article)
+        with max_queries(1):
+            client.get('/article/1/')
+
+    def test_listing_window(self, client, monkeypatch, mock_article,
+                            another_mock_article):
+        monkeypatch.setattr(views, 'PAGE_COUNT', 1)
+        client.get('/')
+        client.get('/page/1/')
+        SqlArticleRepo().save(another_mock_article)
+        with max_queries(1):
+            client.get('/')
+        SqlArticleRepo().save(mock_article)
+        with max_queries(2) as stats:
+            client.get('/page/1/')
+        assert stats.count == 2
+
+    def test_stampede(self, client, monkeypatch):
+        renders = []
+
+        def slow_article_by_id(id):
+            renders.append(id)
+            time.sleep(0.05)
+            return article_by_id(id)
+
+        article_by_id = views.article_by_id
+        monkeypatch.setattr(views, 'article_by_id', slow_article_by_id)
+        responses = []
+        threads = [threading.Thread(
+            target=lambda: responses.append(client.get('/article/1/')))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert renders == [1]
+        assert len({response.data for response in responses}) == 1
+
+    def test_disk_tier(self, client, tmp_path, mock_article):
+        page_cache.configure(16, str(tmp_path))
+        body = client.get('/article/1/').data
+        assert len(os.listdir(tmp_path)) == 1
+
+        page_cache.configure(16, str(tmp_path))
+        with max_queries(1):
+            assert client.get('/article/1/').data == body
+        SqlArticleRepo().save(mock_article)
+        assert os.listdir(tmp_path) == []
+
+    def test_disabled(self, client):
+        page_cache.configure(0)
+        assert client.get('/').status_code == 200
+        assert client.get('/article/1/').status_code == 200
+
+    def test_head(self, client):
+        assert client.head('/').status_code == 200
+        assert client.head('/article/1/').status_code == 200
+
+    def test_saved_elsewhere(self, client, monkeypatch, mock_article):
+        client.get('/article/1/')
+        monkeypatch.setattr(page_cache, 'invalidate', lambda *args: None)
+        mock_article.title = 'New Title'
+        mock_article.updated_at = datetime(year=2018, month=8, day=1)
+        SqlArticleRepo().save(mock_article)
+        assert b'New Title' in client.get('/article/1/').data
+
+    def test_rerendered_elsewhere(self, client, monkeypatch):
+        etag = client.get('/article/1/').headers['ETag']
+        monkeypatch.setattr(page_cache, 'invalidate', lambda *args: None)
+        monkeypatch.setattr(type(content_renderer), 'version', 2)
+        monkeypatch.setattr(type(content_renderer), '__call__',
+                            lambda self, content: '<p>Re-rendered</p>')
+        assert usecase.rerender_articles() == 2
+        response = client.get('/article/1/', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert b'Re-rendered' in response.data
+
+
+class TestCompression(SqlEnvironment):
+    @pytest.fixture
+    def client(self, app, monkeypatch, mock_article):
+        SqlArticleRepo().save(mock_article)
+        monkeypatch.setitem(app.config, 'COMPRESSION_MIN_SIZE', 0)
+        return app.test_client()
+
+    def test_gzip(self, client):
+        plain = client.get('/article/1/')
+        response = client.get('/article/1/',
+                              headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.vary
+        assert gzip.decompress(response.data) == plain.data
+        assert response.get_etag() == (plain.get_etag()[0], True)
+
+        response = client.get('/article/1/', headers={
+            'Accept-Encoding': 'gzip',
+            'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+        assert response.get_etag()[1]
+
+    def test_negotiation(self, app, client, monkeypatch):
+        response = client.get('/article/1/', headers={
+            'Accept-Encoding': 'gzip;q=0, identity'})
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.vary
+
+        monkeypatch.setitem(app.config, 'COMPRESSION_MIN_SIZE', 1 << 20)
+        response = client.get('/article/1/',
+                              headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_brotli(self, client):
+        brotli = pytest.importorskip('brotli')
+        response = client.get('/article/1/',
+                              headers={'Accept-Encoding': 'gzip, br'})
+        assert response.headers['Content-Encoding'] == 'br'
+        assert b'A Title' in brotli.decompress(response.data)
+
+    def test_cached_variant(self, client, monkeypatch):
+        compressed = []
+
+        def compress(data, encoding):
+            compressed.append(encoding)
+            return gzip.compress(data)
+
+        monkeypatch.setattr(cache, 'compress', compress)
+        for _ in range(3):
+            response = client.get('/article/1/',
+                                  headers={'Accept-Encoding': 'gzip'})
+            assert b'A Title' in gzip.decompress(response.data)
+        assert compressed == ['gzip']
+
+
+class TestFeed(SqlEnvironment):
+    ATOM = '{http://www.w3.org/2005/Atom}'
+
+    @pytest.fixture
+    def client(self, app, mock_article, another_mock_article):
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        return app.test_client()
+
+    def titles(self, response):
+        root = ElementTree.fromstring(response.data)
+        return [entry.find(f'{self.ATOM}title').text
+                for entry in root.iter(f'{self.ATOM}entry')]
+
+    def test_feed(self, client):
+        response = client.get('/feed.xml')
+        assert response.mimetype == 'application/atom+xml'
+        assert self.titles(response) == ['Another Title', 'A Title']
+        root = ElementTree.fromstring(response.data)
+        assert root.find(f'{self.ATOM}entry/{self.ATOM}content').text == \
+            "<p>other article's content</p>"
+        assert root.find(f'{self.ATOM}updated').text == \
+            '2018-07-15T00:00:00+00:00'
+
+    def test_entry_limit(self, app, client, monkeypatch):
+        monkeypatch.setitem(app.config, 'FEED_ENTRY_LIMIT', 1)
+        assert self.titles(client.get('/feed.xml')) == ['Another Title']
+
+    def test_incremental(self, client, monkeypatch, mock_article):
+        client.get('/feed.xml')
+        loaded = []
+
+        def articles_of(ids):
+            loaded.append(ids)
+            return load(ids)
+
+        load = views.articles_of
+        monkeypatch.setattr(views, 'articles_of', articles_of)
+        new_article = Article(ArticleId(3), 'New Post', 'content',
+                              mock_article.author,
+                              datetime(year=2018, month=8, day=1), None, None)
+        SqlArticleRepo().save(new_article)
+        assert self.titles(client.get('/feed.xml')) == [
+            'New Post', 'Another Title', 'A Title']
+        assert loaded == [[3]]
+
+        mock_article.title = 'Edited Title'
+        SqlArticleRepo().save(mock_article)
+        assert self.titles(client.get('/feed.xml'))[-1] == 'Edited Title'
+        assert loaded[-1] == [1]
+
+    def test_empty(self, app):
+        before = datetime.now(timezone.utc).replace(microsecond=0)
+        root = ElementTree.fromstring(app.test_client().get('/feed.xml').data)
+        updated = datetime.fromisoformat(root.find(f'{self.ATOM}updated').text)
+        assert before <= updated <= datetime.now(timezone.utc)
+
+    def test_conditional(self, client):
+        response = client.get('/feed.xml')
+        assert 'Last-Modified' not in response.headers
+        etag = response.headers['ETag']
+        with max_queries(1):
+            response = client.get('/feed.xml',
+                                  headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+
+class TestSitemap(SqlEnvironment):
+    NAMESPACE = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+    @pytest.fixture
+    def client(self, app, monkeypatch, mock_article, another_mock_article):
+        repo = SqlArticleRepo()
+        repo.save(mock_article)
+        repo.save(another_mock_article)
+        monkeypatch.setitem(app.config, 'SITEMAP_SHARD_SIZE', 1)
+        yield app.test_client()
+        sitemap_shards.clear()
+
+    def locations(self, response):
+        root = ElementTree.fromstring(response.data)
+        return [loc.text for loc in root.iter(f'{self.NAMESPACE}loc')]
+
+    def test_index(self, client):
+        response = client.get('/sitemap.xml')
+        assert response.mimetype == 'application/xml'
+        assert self.locations(response) == [
+            'http://localhost/sitemap/1.xml', 'http://localhost/sitemap/2.xml']
+        with max_queries(3):
+            response = client.get('/sitemap.xml', headers={
+                'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+
+    def test_shard(self, client):
+        response = client.get('/sitemap/1.xml')
+        assert 'Content-Length' not in response.headers
+        assert self.locations(response) == ['http://localhost/article/1/']
+        with max_queries(1):
+            cached = client.get('/sitemap/1.xml')
+        assert 'Content-Length' in cached.headers
+        assert cached.data == response.data
+        assert self.locations(client.get('/sitemap/2.xml')) == [
+            'http://localhost/article/2/']
+        assert client.get('/sitemap/0.xml').status_code == 404
+        assert client.get('/sitemap/3.xml').status_code == 404
+
+    def test_shard_range_changed(self, client, mock_article,
+                                 another_mock_article):
+        client.get('/sitemap/1.xml').get_data()
+        client.get('/sitemap/2.xml').get_data()
+        SqlArticleRepo().delete(mock_article)
+        assert client.get('/sitemap/1.xml').status_code == 404
+        assert 'Content-Length' in client.get('/sitemap/2.xml').headers
+        assert self.locations(client.get('/sitemap.xml')) == [
+            'http://localhost/sitemap/2.xml']
+
+        another_mock_article.id = ArticleId(3)
+        SqlArticleRepo().save(another_mock_article)
+        assert self.locations(client.get('/sitemap/3.xml')) == [
+            'http://localhost/article/3/']
+
+    def test_late_insert(self, app, client, monkeypatch, mock_article):
+        monkeypatch.setitem(app.config, 'SITEMAP_SHARD_SIZE', 2)
+        assert self.locations(client.get('/sitemap.xml')) == [
+            'http://localhost/sitemap/0.xml', 'http://localhost/sitemap/1.xml']
+        client.get('/sitemap/1.xml').get_data()
+        mock_article.id = ArticleId(5)
+        SqlArticleRepo().save(mock_article)
+        mock_article.id = ArticleId(3)
+        SqlArticleRepo().save(mock_article)
+        assert self.locations(client.get('/sitemap/1.xml')) == [
+            'http://localhost/article/2/', 'http://localhost/article/3/']
+        assert self.locations(client.get('/sitemap/2.xml')) == [
+            'http://localhost/article/5/']
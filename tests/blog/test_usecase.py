@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+from sqlalchemy import inspect
+
+from app.blog import usecase
+from app.blog.adapter.repositories.sql.repos import SqlArticleRepo
+from app.common.adapter.repositories.sql import db
+from tests.common.helpers import SqlEnvironment
+
+
+class TestArticleById(SqlEnvironment):
+    @pytest.fixture(autouse=True)
+    def release(self, table, mock_article, monkeypatch):
+        SqlArticleRepo().save(mock_article)
+        db.session.remove()
+        release = threading.Event()
+        article = SqlArticleRepo.article
+
+        def slow_unless_wrote(repo, id, include_deleted=False):
+            if not repo.wrote():
+                release.wait(5)
+            return article(repo, id, include_deleted)
+
+        monkeypatch.setattr(SqlArticleRepo, 'article', slow_unless_wrote)
+        yield release
+        release.set()
+
+    def start(self, app, count, results):
+        def load():
+            with app.app_context():
+                results.append(usecase.article_by_id(1))
+
+        calls = usecase.article_by_id.metrics.calls
+        threads = [threading.Thread(target=load) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        while usecase.article_by_id.metrics.calls < calls + count:
+            pass
+        return threads
+
+    def test_followers_get_detached_copies(self, app, release):
+        results = []
+        threads = self.start(app, 3, results)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len({id(article) for article in results}) == 3
+        assert all(article == results[0] for article in results)
+        assert [inspect(article).transient for article in results].count(
+            True) == 2
+        assert all(len(article.tags) == 2 for article in results)
+
+    def test_writer_reads_alone(self, app, release, mock_article):
+        threads = self.start(app, 1, [])
+        coalesced = usecase.article_by_id.metrics.coalesced
+        mock_article.title = 'New Title'
+        SqlArticleRepo().save(mock_article)
+        assert usecase.article_by_id(1).title == 'New Title'
+        assert usecase.article_by_id.metrics.coalesced == coalesced
+        release.set()
+        for thread in threads:
+            thread.join()
@@ -1,6 +1,13 @@
+import re
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
 
 from app import create_app
+from app.blog.adapter.repositories.memory.repos import store
+from app.blog.presentation.cache import page_cache
+from app.common.adapter.repositories.instrumentation import record_queries
 from app.common.adapter.repositories.sql import db
 
 
@@ -27,5 +34,79 @@ class SqlEnvironment(FlaskAppContextEnvironment):
         def fin():
             db.session.remove()
             db.drop_all()
+            page_cache.clear()
 
         request.addfinalizer(fin)
+
+
+class MemoryEnvironment(FlaskAppContextEnvironment):
+    @pytest.fixture(scope='class')
+    def app(self):
+        return create_app('testing', DDD_REPOSITORY_BACKEND='memory',
+                          MEMORY_REPOSITORY_SNAPSHOT=False)
+
+    @pytest.fixture(autouse=True)
+    def store(self):
+        yield store
+        store.clear()
+        page_cache.clear()
+
+
+@contextmanager
+def max_queries(count):
+    with record_queries() as stats:
+        yield stats
+    assert stats.count <= count, \
+        f'{stats.count} queries issued, budget is {count}: ' \
+        f'{[statement for statement, _, _ in stats.statements]}'
+
+
+_explainable = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+_select_list = re.compile(r'^SELECT (DISTINCT )?.*? FROM ')
+
+
+@contextmanager
+def query_plans():
+    """Collects ``(statement, plan, parameters)`` for the queries issued
+    in the block, ``plan`` being SQLite's EXPLAIN QUERY PLAN as indented
+    lines. Select lists are elided and repeated pairs kept once, with
+    the parameters of every execution.
+    """
+    issued = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(_explainable):
+            issued.append(
+                (statement, parameters[0] if executemany else parameters))
+
+    plans = []
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield plans
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    connection = db.engine.raw_connection()
+    executions = {}
+    try:
+        for statement, parameters in issued:
+            rows = connection.cursor().execute(
+                f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+            if not rows:
+                continue
+            key = (_select_list.sub(r'SELECT \1... FROM ',
+                                    ' '.join(statement.split())),
+                   tuple(_indent(rows)))
+            if key not in executions:
+                executions[key] = []
+                plans.append((key[0], list(key[1]), executions[key]))
+            executions[key].append(parameters)
+    finally:
+        connection.close()
+
+
+def _indent(rows):
+    depths, lines = {}, []
+    for id, parent, _, detail in rows:
+        depths[id] = depths.get(parent, -1) + 1
+        lines.append('  ' * depths[id] + detail)
+    return lines
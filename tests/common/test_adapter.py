@@ -1,6 +1,34 @@
+import itertools
+import json
+import logging
+import multiprocessing
 import numbers
+import os
+import sys
+import threading
+import time
+from datetime import datetime
 
-from app.common.adapter.services import generate_unique_id
+import pytest
+from sqlalchemy import create_engine
+
+from app import create_app
+from app.blog.adapter.repositories.sql.tables import tag
+from app.blog.domain.models import Tag, TagId, Article, ArticleId, Author
+from app.blog.domain.registries import repos
+from app.common.domain.registries import services
+from app.common.adapter.repositories.instrumentation import record_queries
+from app.common.adapter.repositories.sql import db, read_only
+from app.common.adapter import services as service_module
+from app.common.adapter.caches import LRUCache
+from app.common.adapter.warmup import warmup
+from ddd import profiler
+from app.common.adapter.repositories.sql import id_sequence
+from app.common.adapter.services import generate_unique_id, \
+    generate_unique_ids, SnowflakeIdGenerator, HiLoIdGenerator, EPOCH, \
+    SEQUENCE_BITS, WORKER_ID_BITS, reserve_worker_id
+from tests.common.helpers import FlaskAppContextEnvironment, SqlEnvironment, \
+    max_queries
 
 
 class TestGenerateUniqueId:
@@ -9,3 +37,414 @@ class TestGenerateUniqueId:
 
     def test_generate_different_id(self):
         assert generate_unique_id() != generate_unique_id()
+
+    def test_generate_unique_ids(self):
+        ids = generate_unique_ids(10)
+        assert len(set(ids)) == 10
+        assert ids == sorted(ids)
+
+
+class TestSnowflakeIdGenerator:
+    def test_layout(self):
+        generator = SnowflakeIdGenerator(worker_id=5)
+        id = generator.next()
+        assert 0 < id < 1 << 63
+        assert id >> SEQUENCE_BITS & ((1 << WORKER_ID_BITS) - 1) == 5
+        timestamp = (id >> (SEQUENCE_BITS + WORKER_ID_BITS)) + EPOCH
+        assert abs(timestamp - time.time() * 1000) < 1000
+
+    def test_worker_id_out_of_range(self):
+        with pytest.raises(ValueError):
+            SnowflakeIdGenerator(worker_id=1 << WORKER_ID_BITS)
+
+    def test_workers_do_not_collide(self):
+        ids = SnowflakeIdGenerator(1).next_many(10000) + \
+            SnowflakeIdGenerator(2).next_many(10000)
+        assert len(set(ids)) == 20000
+
+    def test_burst_borrows_from_future(self, monkeypatch):
+        generator = SnowflakeIdGenerator()
+        monkeypatch.setattr(generator, '_now', lambda: 0)
+        generator._clock = itertools.count(0)
+        ids = generator.next_many(3 << SEQUENCE_BITS)
+        assert len(set(ids)) == len(ids)
+        assert ids == sorted(ids)
+
+    def test_catch_up_with_wall_clock(self, monkeypatch):
+        generator = SnowflakeIdGenerator()
+        before = generator.next()
+        now = generator._now() + (100 << SEQUENCE_BITS)
+        monkeypatch.setattr(generator, '_now', lambda: now)
+        generator.next()
+        after = generator.next()
+        assert after > before
+        assert after >> (SEQUENCE_BITS + WORKER_ID_BITS) == \
+            now >> SEQUENCE_BITS
+
+    def test_unique_across_threads(self):
+        generator = SnowflakeIdGenerator()
+        thread_count, per_thread = 8, 250000
+        results = [None] * thread_count
+
+        def generate(index):
+            next_id = generator.next
+            results[index] = [next_id() for _ in range(per_thread)]
+
+        threads = [threading.Thread(target=generate, args=(i,))
+                   for i in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = set(itertools.chain.from_iterable(results))
+        assert len(ids) == thread_count * per_thread
+        assert all(r == sorted(r) for r in results)
+
+    def test_unique_across_catch_ups(self, monkeypatch):
+        generator = SnowflakeIdGenerator()
+        # Every reading of the wall clock jumps two milliseconds ahead, so
+        # nearly every draw retires the clock other threads are using.
+        wall_clock = itertools.count(generator._now(), 2 << SEQUENCE_BITS)
+        monkeypatch.setattr(generator, '_now', lambda: next(wall_clock))
+        thread_count, rounds, batch = 8, 50, 2 << SEQUENCE_BITS
+        results = [[] for _ in range(thread_count)]
+
+        def generate(index):
+            for _ in range(rounds):
+                results[index].extend(generator.next_many(batch))
+                results[index].append(generator.next())
+
+        threads = [threading.Thread(target=generate, args=(i,))
+                   for i in range(thread_count)]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        ids = list(itertools.chain.from_iterable(results))
+        assert len(set(ids)) == len(ids) == \
+            thread_count * rounds * (batch + 1)
+
+    def test_reserved_worker_ids(self, tmp_path):
+        engine = create_engine(f'sqlite:///{tmp_path / "ids.sqlite"}')
+        id_sequence.create(engine)
+        first = SnowflakeIdGenerator(lambda: reserve_worker_id(engine))
+        second = SnowflakeIdGenerator(lambda: reserve_worker_id(engine))
+        assert first.worker_id is None
+        first.next()
+        second.next()
+        assert (first.worker_id, second.worker_id) == (0, 1)
+        first.reset()
+        first.next_many(2)
+        assert first.worker_id == 2
+        engine.dispose()
+
+    def test_forked_workers_reserve_their_own(self, tmp_path, monkeypatch):
+        engine = create_engine(f'sqlite:///{tmp_path / "ids.sqlite"}')
+        id_sequence.create(engine)
+        generator = SnowflakeIdGenerator(lambda: reserve_worker_id(engine))
+        monkeypatch.setattr(service_module, '_id_generator', generator)
+        parent = _worker_id_of_new_id()
+        engine.dispose()
+        with multiprocessing.get_context('fork').Pool(
+                3, maxtasksperchild=1) as pool:
+            children = pool.map(_worker_id_of_new_id, range(3), chunksize=1)
+        assert len({parent, *children}) == 4
+        engine.dispose()
+
+
+def _worker_id_of_new_id(_=None):
+    return generate_unique_id() >> SEQUENCE_BITS & \
+        ((1 << WORKER_ID_BITS) - 1)
+
+
+def _allocate_ids(path, count=2000):
+    engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 30})
+    return HiLoIdGenerator(engine, block_size=100).next_many(count)
+
+
+class TestHiLoIdGenerator:
+    @pytest.fixture
+    def path(self, tmp_path):
+        path = tmp_path / 'ids.sqlite'
+        engine = create_engine(f'sqlite:///{path}')
+        id_sequence.create(engine)
+        engine.dispose()
+        return path
+
+    @pytest.fixture
+    def engine(self, path):
+        engine = create_engine(f'sqlite:///{path}')
+        yield engine
+        engine.dispose()
+
+    def test_sequential_blocks(self, engine):
+        generator = HiLoIdGenerator(engine, block_size=10)
+        assert generator.next_many(25) == list(range(1, 26))
+        next_value = engine.execute(id_sequence.select()).first().next_value
+        assert next_value == 31
+
+    def test_prefetch_next_block(self, engine):
+        generator = HiLoIdGenerator(engine, block_size=10, prefetch_ratio=0.5)
+        generator.next_many(5)
+        generator._prefetched.result()
+        assert engine.execute(id_sequence.select()).first().next_value == 21
+        assert generator.next_many(10) == list(range(6, 16))
+
+    def test_generators_do_not_collide(self, engine):
+        first = HiLoIdGenerator(engine, block_size=10)
+        second = HiLoIdGenerator(engine, block_size=10)
+        ids = [generator.next() for _ in range(50)
+               for generator in (first, second)]
+        assert len(set(ids)) == 100
+
+    def test_unique_across_processes(self, path):
+        with multiprocessing.get_context('spawn').Pool(4) as pool:
+            results = pool.map(_allocate_ids, [path] * 4)
+        ids = list(itertools.chain.from_iterable(results))
+        assert len(set(ids)) == len(ids) == 8000
+
+    def test_forked_during_reservation(self, engine, monkeypatch):
+        generator = HiLoIdGenerator(engine, block_size=10)
+        monkeypatch.setattr(service_module, '_id_generator', generator)
+        parent = generator.next()
+        with generator._lock:
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    ids = []
+                    thread = threading.Thread(
+                        target=lambda: ids.append(generator.next()))
+                    thread.start()
+                    thread.join(5)
+                    os._exit(0 if ids and ids[0] > parent + 1 else 1)
+                finally:
+                    os._exit(2)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
+    def test_selected_by_config(self, path, monkeypatch):
+        monkeypatch.setattr(service_module, '_id_generator',
+                            service_module._id_generator)
+        app = create_app('testing', ID_GENERATOR='hilo',
+                         SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}')
+        with app.app_context():
+            assert services.generate_unique_id() == 1
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert [key for key, _ in cache.items()] == ['a', 'c']
+
+
+class TestSqlitePragmas(FlaskAppContextEnvironment):
+    def test_pragmas_applied_on_connect(self, app):
+        pragmas = app.config['SQLITE_PRAGMAS']
+        with db.engine.connect() as conn:
+            def pragma(name):
+                return conn.execute(f'PRAGMA {name}').scalar()
+
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1
+            assert pragma('temp_store') == 2
+            assert pragma('busy_timeout') == pragmas['busy_timeout']
+            assert pragma('cache_size') == pragmas['cache_size']
+            assert pragma('mmap_size') == pragmas['mmap_size']
+
+
+class TestReplicaRouting(SqlEnvironment):
+    @pytest.fixture(scope='class')
+    def app(self, tmp_path_factory):
+        replica = tmp_path_factory.mktemp('replica') / 'replica.sqlite'
+        return create_app('testing',
+                          SQLALCHEMY_REPLICA_URIS=[f'sqlite:///{replica}'])
+
+    @pytest.fixture(autouse=True)
+    def replica(self, table):
+        replica, = db.get_replica_engines()
+        db.metadata.create_all(bind=replica)
+        replica.execute(tag.insert().values({'__id': 1, 'name': 'replica'}))
+        yield replica
+        db.metadata.drop_all(bind=replica)
+
+    @read_only
+    def tag_names(self):
+        return [row.name for row in db.session.query(tag).all()]
+
+    def test_reads_go_to_replica(self):
+        assert self.tag_names() == ['replica']
+
+    def test_writes_go_to_primary(self):
+        db.session.execute(tag.insert().values({'__id': 2, 'name': 'primary'}))
+        db.session.commit()
+        db.session.remove()
+        assert self.tag_names() == ['replica']
+        assert [row.name for row in db.engine.execute(tag.select())] == \
+            ['primary']
+
+    def test_reads_after_write_stick_to_primary(self):
+        db.session.add(Tag(TagId(2), 'primary'))
+        db.session.commit()
+        assert self.tag_names() == ['primary']
+
+        db.session.remove()
+        assert self.tag_names() == ['replica']
+
+    def test_reads_after_raw_write_stick_to_primary(self):
+        db.session.execute(tag.insert().values({'__id': 2, 'name': 'primary'}))
+        assert self.tag_names() == ['primary']
+        db.session.commit()
+
+        db.session.remove()
+        db.session.execute('UPDATE tag SET name = :name', {'name': 'raw'})
+        assert self.tag_names() == ['raw']
+        db.session.commit()
+
+        db.session.remove()
+        db.session.query(Tag).delete()
+        assert self.tag_names() == []
+        db.session.rollback()
+
+
+class TestSqlInstrumentation(SqlEnvironment):
+    @pytest.fixture(autouse=True)
+    def articles(self, table):
+        for id in range(1, 4):
+            repos.article.save(Article(
+                ArticleId(id), f'Title {id}', 'content', Author(1, 'psyche'),
+                datetime(year=2018, month=7, day=id), None, None))
+        db.session.remove()
+
+    def test_record_queries(self):
+        with record_queries() as stats:
+            repos.article.recent_articles_of_page()
+        assert stats.count == 1
+        assert stats.loaded == 3
+        assert stats.total_time > 0
+
+    def test_query_budget(self, app):
+        client = app.test_client()
+        with max_queries(2):
+            client.get('/')
+        with max_queries(2):
+            client.get('/article/1/')
+
+        with max_queries(2):
+            client.get('/')
+            client.get('/article/1/')
+
+        with pytest.raises(AssertionError):
+            with max_queries(1):
+                client.get('/')
+                client.get('/article/1/')
+
+    def test_server_timing_header(self, app):
+        response = app.test_client().get('/')
+        assert 'desc="2 queries"' in response.headers['Server-Timing']
+
+    def test_log_repeated_statements(self, app, caplog, monkeypatch):
+        monkeypatch.setitem(app.config, 'SQL_N_PLUS_ONE_THRESHOLD', 3)
+
+        def request_with_queries(count):
+            caplog.clear()
+            with app.test_request_context('/'), \
+                    caplog.at_level(logging.WARNING):
+                app.preprocess_request()
+                for id in range(count):
+                    db.session.execute(tag.select().where(tag.c['__id'] == id))
+                app.process_response(app.response_class())
+            return any('N+1' in message for message in caplog.messages)
+
+        assert not request_with_queries(2)
+        assert request_with_queries(3)
+
+    def test_log_slow_queries(self, app, caplog, monkeypatch):
+        monkeypatch.setitem(app.config, 'SQL_SLOW_QUERY_THRESHOLD', 0)
+        with caplog.at_level(logging.WARNING):
+            repos.article.recent_articles_of_page()
+        assert any('Slow query' in message for message in caplog.messages)
+
+
+class TestWarmup(SqlEnvironment):
+    @pytest.fixture
+    def warmed_app(self, tmp_path):
+        repos.article.save(Article(
+            ArticleId(1), 'Title', 'content', Author(1, 'psyche'),
+            datetime(year=2018, month=7, day=1), None, None))
+        return create_app('testing',
+                          TEMPLATE_BYTECODE_CACHE_DIR=str(tmp_path))
+
+    def test_warmup(self, warmed_app, tmp_path):
+        result = warmup(warmed_app)
+        templates = warmed_app.jinja_env.list_templates()
+        assert result['templates'] == len(templates) >= 4
+        assert len(os.listdir(tmp_path)) == len(templates)
+        assert result['connections'] == \
+            warmed_app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size']
+
+        client = warmed_app.test_client()
+        with max_queries(2):
+            assert client.get('/').status_code == 200
+            assert client.get('/article/1/').status_code == 200
+
+    def test_warmup_command(self, warmed_app):
+        result = warmed_app.test_cli_runner().invoke(args=['warmup'])
+        assert result.output.startswith('Warmed up ')
+
+
+class TestMemoryProfiling(SqlEnvironment):
+    @pytest.fixture
+    def profiled_app(self):
+        repos.article.save(Article(
+            ArticleId(1), 'Title', 'content', Author(1, 'psyche'),
+            datetime(year=2018, month=7, day=1), None, None))
+        yield create_app('testing', MEMORY_PROFILING=True,
+                         MEMORY_PROFILING_SAMPLE_RATE=1.0,
+                         PAGE_CACHE_SIZE=0)
+        profiler.configure()
+
+    def test_profile_requests(self, profiled_app):
+        client = profiled_app.test_client()
+        assert client.get('/article/1/').status_code == 200
+        assert client.get('/article/1/').status_code == 200
+        summary = client.get('/_debug/memory').get_json()
+        assert summary['samples'] == 2
+        request = summary['units']['GET /article/<int:id>/']
+        assert request['count'] == 2
+        assert request['peak'] > 0
+        assert summary['calls'][
+            'app.blog.usecase.article_by_id']['count'] == 2
+        assert 'templates' in summary['modules']
+
+    def test_local_only(self, profiled_app):
+        client = profiled_app.test_client()
+        assert client.get('/_debug/memory', environ_base={
+            'REMOTE_ADDR': '10.0.0.1'}).status_code == 404
+        assert client.get('/_debug/memory', headers={
+            'X-Forwarded-For': '10.0.0.1'}).status_code == 404
+        assert client.get('/_debug/memory', headers={
+            'X-Forwarded-For': '127.0.0.1, 203.0.113.9'
+        }, environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 404
+
+    def test_unsampled(self, profiled_app):
+        profiler.configure(sample_rate=0.0)
+        profiled_app.test_client().get('/article/1/')
+        assert profiler.summary()['samples'] == 0
+
+    def test_command(self, profiled_app):
+        result = profiled_app.test_cli_runner().invoke(
+            args=['profile-memory', '/article/1/', '--repeat', '3'])
+        summary = json.loads(result.output)
+        assert summary['units']['GET /article/<int:id>/']['count'] == 3
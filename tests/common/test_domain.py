@@ -28,3 +28,8 @@ class TestId:
         aid = AId.next()
         another_id = AId(1)
         assert aid == another_id
+
+    @patch('app.common.domain.registries.services.generate_unique_ids',
+           side_effect=lambda count: list(range(count)), create=True)
+    def test_next_many(self, _, AId):
+        assert AId.next_many(3) == [AId(0), AId(1), AId(2)]